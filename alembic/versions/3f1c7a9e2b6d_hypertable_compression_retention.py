@@ -0,0 +1,67 @@
+"""Hypertable chunk interval, native compression and retention policies
+
+Intervals are read from environment (.env), changing them later needs a new migration:
+- TIMESCALEDB_CHUNK_INTERVAL - time range of new chunks (default 7 days)
+- TIMESCALEDB_COMPRESS_AFTER - age of chunks compressed by background job (default 30 days)
+- TIMESCALEDB_RETENTION - age of raw conditions dropped by background job (default unset - keep forever),
+  hourly/daily rollups keep aggregates of dropped conditions
+
+Revision ID: 3f1c7a9e2b6d
+Revises: b7e2d4c91a03
+Create Date: 2026-10-18 10:05:48.271930
+
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c7a9e2b6d'
+down_revision = 'b7e2d4c91a03'
+branch_labels = None
+depends_on = None
+
+HYPERTABLE = 'weather_real_time'
+CHUNK_INTERVAL = os.getenv('TIMESCALEDB_CHUNK_INTERVAL', '7 days')
+COMPRESS_AFTER = os.getenv('TIMESCALEDB_COMPRESS_AFTER', '30 days')
+RETENTION = os.getenv('TIMESCALEDB_RETENTION')
+
+
+def timescaledb_installed() -> bool:
+    query = sa.text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')")
+    return op.get_bind().execute(query).scalar()
+
+
+def upgrade() -> None:
+    if not timescaledb_installed():
+        return
+
+    # Applies to chunks created from now on
+    op.execute(f"SELECT set_chunk_time_interval('{HYPERTABLE}', INTERVAL '{CHUNK_INTERVAL}')")
+
+    # Conditions of a station are stored together, ordered for the "most recent conditions" reads
+    op.execute(
+        f"""
+        ALTER TABLE {HYPERTABLE} SET (
+            timescaledb.compress,
+            timescaledb.compress_segmentby = 'station_id',
+            timescaledb.compress_orderby = 'time DESC'
+        )
+        """
+    )
+    op.execute(f"SELECT add_compression_policy('{HYPERTABLE}', INTERVAL '{COMPRESS_AFTER}')")
+
+    if RETENTION:
+        op.execute(f"SELECT add_retention_policy('{HYPERTABLE}', INTERVAL '{RETENTION}')")
+
+
+def downgrade() -> None:
+    if not timescaledb_installed():
+        return
+
+    op.execute(f"SELECT remove_retention_policy('{HYPERTABLE}', if_exists => true)")
+    op.execute(f"SELECT remove_compression_policy('{HYPERTABLE}', if_exists => true)")
+    op.execute(f"SELECT decompress_chunk(chunk, if_compressed => true) FROM show_chunks('{HYPERTABLE}') AS chunk")
+    op.execute(f"ALTER TABLE {HYPERTABLE} SET (timescaledb.compress = false)")
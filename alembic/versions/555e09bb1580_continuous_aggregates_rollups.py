@@ -0,0 +1,80 @@
+"""Continuous aggregates - hourly and daily rollups of weather conditions
+
+Revision ID: 555e09bb1580
+Revises: a08dc5f45b75
+Create Date: 2026-10-18 09:12:41.118304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '555e09bb1580'
+down_revision = 'a08dc5f45b75'
+branch_labels = None
+depends_on = None
+
+# view, bucket width, refresh policy start offset, end offset and schedule interval
+# (views and columns are read by src/graphql_api/rollups.py)
+ROLLUPS = (
+    ('weather_hourly', '1 hour', '3 days', '1 hour', '30 minutes'),
+    ('weather_daily', '1 day', '7 days', '1 day', '1 hour'),
+)
+AGGREGATED_COLUMNS = ('temperature', 'humidity', 'pressure', 'battery_percentage')
+
+
+def timescaledb_installed() -> bool:
+    query = sa.text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')")
+    return op.get_bind().execute(query).scalar()
+
+
+def upgrade() -> None:
+    if not timescaledb_installed():
+        return  # plain PostgreSQL - aggregates are always computed from raw conditions
+
+    # Partial aggregates which can be merged into coarser buckets (avg = sum / count)
+    aggregates = ',\n'.join(
+        f'min({column}) AS {column}_min, max({column}) AS {column}_max, '
+        f'sum({column}) AS {column}_sum, count({column}) AS {column}_count, '
+        f'first({column}, time) AS {column}_first, last({column}, time) AS {column}_last'
+        for column in AGGREGATED_COLUMNS
+    )
+    for view, width, start_offset, end_offset, schedule_interval in ROLLUPS:
+        op.execute(
+            f"""
+            CREATE MATERIALIZED VIEW {view}
+            WITH (timescaledb.continuous, timescaledb.materialized_only = true) AS
+            SELECT station_id,
+                   time_bucket(INTERVAL '{width}', time) AS bucket,
+                   min(time) AS first_time,
+                   max(time) AS last_time,
+                   {aggregates}
+            FROM weather_real_time
+            GROUP BY station_id, bucket
+            WITH NO DATA
+            """
+        )
+        op.execute(
+            f"""
+            SELECT add_continuous_aggregate_policy(
+                '{view}',
+                start_offset => INTERVAL '{start_offset}',
+                end_offset => INTERVAL '{end_offset}',
+                schedule_interval => INTERVAL '{schedule_interval}'
+            )
+            """
+        )
+
+    # Materialize existing history, refresh can't run inside transaction
+    with op.get_context().autocommit_block():
+        for view, *_ in ROLLUPS:
+            op.execute(f"CALL refresh_continuous_aggregate('{view}', NULL, NULL)")
+
+
+def downgrade() -> None:
+    if not timescaledb_installed():
+        return
+
+    for view, *_ in reversed(ROLLUPS):
+        op.execute(f'DROP MATERIALIZED VIEW IF EXISTS {view}')  # removes refresh policy as well
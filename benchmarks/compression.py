@@ -0,0 +1,120 @@
+"""Storage and scan time of conditions hypertable before vs after native compression (TimescaleDB)
+
+Compresses all chunks of `weather_real_time` (compression settings from migrations), `--restore` decompresses
+chunks compressed by the benchmark afterwards:
+
+    python -m benchmarks.compression --station-id 12 --restore
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Optional
+
+from sqlalchemy import text
+
+from src.dependencies.config import get_config
+from src.dependencies.database import Database
+from src.dependencies.database import create_database
+from src.graphql_api.storage import HYPERTABLE
+from src.graphql_api.storage import hypertable_storage
+
+SCAN_QUERIES = {
+    # full scan aggregating all conditions
+    "aggregate_all": "SELECT count(*), avg(temperature), max(humidity) FROM weather_real_time",
+    # most recent conditions of a station, served by segmentby/orderby of compressed chunks
+    "station_recent": ("SELECT * FROM weather_real_time WHERE station_id = :station_id ORDER BY time DESC LIMIT 1000"),
+    # station history aggregated per day
+    "station_daily": (
+        "SELECT time_bucket(INTERVAL '1 day', time) AS bucket, avg(temperature) FROM weather_real_time "
+        "WHERE station_id = :station_id GROUP BY bucket"
+    ),
+}
+
+
+async def measure_scans(db: Database, station_id: Optional[int], repeat: int) -> dict[str, float]:
+    """Median duration (ms) of scan queries"""
+
+    durations = {}
+    async with db.session() as session:
+        if station_id is None:
+            station_id = (await session.execute(text("SELECT min(station_id) FROM weather_real_time"))).scalar()
+        for name, query in SCAN_QUERIES.items():
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                await session.execute(text(query), {"station_id": station_id})
+                samples.append((time.perf_counter() - started) * 1000)
+            durations[name] = statistics.median(samples)
+    return durations
+
+
+async def measure(db: Database, station_id: Optional[int], repeat: int) -> dict[str, Any]:
+    async with db.session() as session:
+        readings = (await session.execute(text(f"SELECT count(*) FROM {HYPERTABLE}"))).scalar()
+    storage = await hypertable_storage(db)
+    total_bytes = storage.total_bytes()
+    return {
+        "readings": readings,
+        "chunks": len(storage.chunks),
+        "compressed_chunks": storage.compressed_chunks(),
+        "total_bytes": total_bytes,
+        "bytes_per_reading": total_bytes / readings if readings else None,
+        "scan_ms": await measure_scans(db, station_id, repeat),
+    }
+
+
+async def set_compression(db: Database, chunks: list[str], compress: bool) -> None:
+    function = "compress_chunk" if compress else "decompress_chunk"
+    for chunk in chunks:  # transaction per chunk, locks are held until commit
+        async with db.session() as session:
+            await session.execute(text(f"SELECT {function}(CAST(CAST(:chunk AS TEXT) AS regclass))"), {"chunk": chunk})
+
+
+async def benchmark(station_id: Optional[int], repeat: int, restore: bool) -> dict[str, Any]:
+    db = create_database(get_config())
+    try:
+        if not await db.timescaledb_available():
+            raise SystemExit("Compression benchmark requires TimescaleDB.")
+
+        before = await measure(db, station_id, repeat)
+        async with db.session() as session:
+            query = text(
+                "SELECT format('%I.%I', chunk_schema, chunk_name) FROM timescaledb_information.chunks "
+                "WHERE hypertable_name = :hypertable AND NOT is_compressed ORDER BY range_start"
+            )
+            uncompressed = list((await session.execute(query, {"hypertable": HYPERTABLE})).scalars())
+        started = time.perf_counter()
+        await set_compression(db, uncompressed, compress=True)
+        compression_seconds = time.perf_counter() - started
+        after = await measure(db, station_id, repeat)
+
+        if restore:
+            await set_compression(db, uncompressed, compress=False)
+    finally:
+        await db.dispose()
+
+    return {
+        "before": before,
+        "after": after,
+        "compressed_chunks": len(uncompressed),
+        "compression_seconds": compression_seconds,
+        "size_ratio": before["total_bytes"] / after["total_bytes"] if after["total_bytes"] else None,
+    }
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="Compare hypertable size and scan time before/after compression.")
+    arguments.add_argument("--station-id", type=int, help="station used by station queries, defaults to lowest id")
+    arguments.add_argument("--repeat", type=int, default=5, help="runs of each scan query, median is reported")
+    arguments.add_argument("--restore", action="store_true", help="decompress chunks compressed by the benchmark")
+    args = arguments.parse_args()
+
+    result = asyncio.run(benchmark(args.station_id, args.repeat, args.restore))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Payload size and CPU time of `weatherSeries` (columnar) vs `weatherData` (object per condition)
+
+Both queries are executed in-process through the ASGI app, so CPU time includes GraphQL execution and JSON encoding.
+Without `--database-url` a temporary SQLite database with `--stations` x `--readings` conditions is generated:
+
+    python -m benchmarks.series --stations 10 --readings 100000
+"""
+
+import argparse
+import datetime
+import json
+import os
+import tempfile
+import time
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+
+from src import models
+from src.dependencies.config import get_config
+
+QUERIES = {
+    "weatherData": "query { weatherData { time resourceId batteryPercentage temperature humidity pressure } }",
+    "weatherSeries": ("query { weatherSeries { resourceId time batteryPercentage temperature humidity pressure } }"),
+}
+
+
+def generate_database(path: str, stations: int, readings: int) -> str:
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)
+    start = datetime.datetime(2022, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(insert(models.MonitorUser), [{"id": 1, "username": "benchmark", "password": "benchmark"}])
+        connection.execute(
+            insert(models.WeatherStation),
+            [
+                {
+                    "station_id": station,
+                    "longitude": station,
+                    "latitude": station,
+                    "api_key": str(station),
+                    "user_id": 1,
+                }
+                for station in range(1, stations + 1)
+            ],
+        )
+        for station in range(1, stations + 1):
+            connection.execute(
+                insert(models.StationCondition),
+                [
+                    {
+                        # stations report at different seconds, times are unique across stations
+                        "time": start + datetime.timedelta(minutes=reading, seconds=station % 60),
+                        "station_id": station,
+                        "battery_percentage": 100 - reading % 100,
+                        "temperature": 10 + reading % 20,
+                        "humidity": 50 + reading % 40,
+                        "pressure": 1000 + reading % 30,
+                    }
+                    for reading in range(readings)
+                ],
+            )
+    engine.dispose()
+    return f"sqlite+aiosqlite:///{path}"
+
+
+def measure(client: TestClient, query: str, repeat: int) -> dict[str, Any]:
+    cpu_seconds, wall_seconds, payload = [], [], b""
+    for _ in range(repeat):
+        started_cpu, started_wall = time.process_time(), time.perf_counter()
+        response = client.post("/graphql", json={"query": query})
+        cpu_seconds.append(time.process_time() - started_cpu)
+        wall_seconds.append(time.perf_counter() - started_wall)
+        payload = response.content
+        if "errors" in response.json():
+            raise SystemExit(response.json()["errors"])
+    return {"payload_bytes": len(payload), "cpu_seconds": min(cpu_seconds), "wall_seconds": min(wall_seconds)}
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="Compare weatherSeries and weatherData payload size and CPU.")
+    arguments.add_argument("--database-url", help="existing database, generated SQLite database when not set")
+    arguments.add_argument("--stations", type=int, default=10)
+    arguments.add_argument("--readings", type=int, default=100000, help="conditions per station")
+    arguments.add_argument("--repeat", type=int, default=3, help="runs of each query, the fastest is reported")
+    args = arguments.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database_url
+        if not database_url:
+            database_url = generate_database(os.path.join(directory, "series.db"), args.stations, args.readings)
+        os.environ["DB_URL"] = database_url
+        os.environ["GRAPHQL_MAX_SERIES_POINTS"] = str(10**9)  # no cap, weatherData has none
+        get_config.cache_clear()
+
+        from src.main import app
+
+        with TestClient(app) as client:
+            results = {name: measure(client, query, args.repeat) for name, query in QUERIES.items()}
+
+    results["payload_ratio"] = results["weatherData"]["payload_bytes"] / results["weatherSeries"]["payload_bytes"]
+    results["cpu_ratio"] = results["weatherData"]["cpu_seconds"] / results["weatherSeries"]["cpu_seconds"]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,43 @@
-from typing import Optional
+from typing import NamedTuple, Optional
 
 from fastapi import Depends
 from fastapi import Header
 from fastapi import Request
+from fastapi.requests import HTTPConnection
 from sqlalchemy import select
 
+from src.dependencies.cache import TTLCache
+from src.dependencies.config import Config
+from src.dependencies.config import get_config
 from src.dependencies.database import Database
 from src.dependencies.database import get_database
 from src.models import WeatherStation
 
+_NOT_CACHED = object()
+
+
+class AuthStation(NamedTuple):
+    """Weather station authenticated by its API key"""
+
+    station_id: int
+    user_id: int
+
+
+def get_api_key_cache(connection: HTTPConnection) -> TTLCache:
+    """API key -> `AuthStation` cache dependency - returns the instance created on application startup
+
+    Unknown API keys are cached as `None` so repeated requests with a bad key don't hit the database either.
+    """
+    return connection.app.state.api_key_cache
+
 
 async def get_auth_weather_station(
     request: Request,
     db: Database = Depends(get_database),
+    config: Config = Depends(get_config),
+    api_key_cache: TTLCache = Depends(get_api_key_cache),
     Authorization: str | None = Header(default="Bearer <api_key>"),
-) -> Optional[WeatherStation]:
+) -> Optional[AuthStation]:
     """Get weather station based on request header API key"""
 
     authorization = request.headers.get("Authorization", "")
@@ -27,9 +50,19 @@ async def get_auth_weather_station(
     if auth_type != "Bearer" or not api_key:
         return None  # invalid type or empty api_key
 
+    auth_station = api_key_cache.get(api_key, _NOT_CACHED)
+    if auth_station is not _NOT_CACHED:
+        return auth_station
+
     async with db.session() as session:
-        query = select(WeatherStation).where(WeatherStation.api_key == api_key)
+        query = select(WeatherStation.station_id, WeatherStation.user_id).where(WeatherStation.api_key == api_key)
         result = await session.execute(query)
-        weather_station = result.scalar()
+        weather_station = result.first()
+
+    if not weather_station:
+        api_key_cache.set(api_key, None, ttl=config.API_KEY_CACHE_NEGATIVE_TTL)
+        return None
 
-    return weather_station
+    auth_station = AuthStation(station_id=weather_station.station_id, user_id=weather_station.user_id)
+    api_key_cache.set(api_key, auth_station)
+    return auth_station
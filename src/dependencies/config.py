@@ -1,5 +1,6 @@
 import os
 from functools import lru_cache
+from typing import Optional
 
 from dotenv import load_dotenv
 from pydantic import BaseSettings
@@ -13,6 +14,47 @@ class Config(BaseSettings):
     DB_USER: str = os.getenv("DB_USER")
     DB_PASS: str = os.getenv("POSTGRES_PASSWORD")
     DB_NAME: str = os.getenv("POSTGRES_DB")
+    DB_URL: Optional[str] = None  # full connection url, overrides DB_* values above (ie. sqlite+aiosqlite:// in tests)
+
+    # Connection pool shared by all requests, see `src.dependencies.database.create_database`
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800  # seconds after which a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+
+    # Weather station API key -> station cache, see `src.dependencies.auth.get_auth_weather_station`
+    API_KEY_CACHE_SIZE: int = 10000
+    API_KEY_CACHE_TTL: float = 300.0  # seconds
+    API_KEY_CACHE_NEGATIVE_TTL: float = 30.0  # seconds to remember unknown API keys
+
+    GRAPHQL_MAX_PAGE_SIZE: int = 1000  # max conditions per page of *Connection fields
+    GRAPHQL_MAX_AGGREGATE_BUCKETS: int = 10000  # max buckets (of all stations) returned by weatherAggregates
+    GRAPHQL_MAX_SERIES_POINTS: int = 1000000  # max conditions (of all stations) returned by weatherSeries
+
+    # In-memory grid of station locations, SQL queries are used when disabled, see `src.graphql_api.spatial`
+    STATION_INDEX_ENABLED: bool = True
+    STATION_INDEX_CELL_DEGREES: float = 1.0
+
+    INGEST_BATCH_MAX_SIZE: int = 1000  # max station conditions accepted by POST /conditions/batch
+
+    # Write-behind buffer for POST /conditions, see `src.ingest.buffer.IngestBuffer`
+    INGEST_BUFFER_ENABLED: bool = True
+    INGEST_BUFFER_MAX_SIZE: int = 10000  # pending conditions, requests over the limit get 503
+    INGEST_FLUSH_SIZE: int = 500
+    INGEST_FLUSH_INTERVAL_MS: int = 100
+    INGEST_ACK_AFTER_FLUSH: bool = False  # respond only once the condition is stored
+    INGEST_RETRY_AFTER: int = 1  # seconds, Retry-After header value when the buffer is full
+
+    EXPORT_CHUNK_SIZE: int = 10000  # conditions fetched from cursor (and Parquet row group) at once by GET /export
+
+    SUBSCRIPTION_QUEUE_SIZE: int = 100  # pending conditions per subscription, see `src.ingest.broadcast`
+
+    @property
+    def database_url(self) -> str:
+        if self.DB_URL:
+            return self.DB_URL
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}/{self.DB_NAME}"
 
 
 @lru_cache()
@@ -1,10 +1,21 @@
+from typing import Optional
+
 from fastapi import Depends
 from strawberry.fastapi import BaseContext
 
+from src.dependencies.auth import get_api_key_cache
+from src.dependencies.cache import TTLCache
 from src.dependencies.config import Config
 from src.dependencies.config import get_config
 from src.dependencies.database import Database
 from src.dependencies.database import get_database
+from src.dependencies.ingest import get_condition_broadcaster
+from src.dependencies.ingest import get_latest_conditions
+from src.dependencies.stations import get_station_index
+from src.graphql_api.loaders import create_station_conditions_loader
+from src.graphql_api.spatial import StationIndex
+from src.ingest.broadcast import ConditionBroadcaster
+from src.ingest.latest import LatestConditions
 
 
 class AppContext(BaseContext):
@@ -17,7 +28,16 @@ class AppContext(BaseContext):
         self,
         config: Config = Depends(get_config),
         db: Database = Depends(get_database),
+        api_key_cache: TTLCache = Depends(get_api_key_cache),
+        latest_conditions: LatestConditions = Depends(get_latest_conditions),
+        condition_broadcaster: ConditionBroadcaster = Depends(get_condition_broadcaster),
+        station_index: Optional[StationIndex] = Depends(get_station_index),
     ):
         super().__init__()
         self.config = config
         self.db = db
+        self.api_key_cache = api_key_cache
+        self.latest_conditions = latest_conditions
+        self.condition_broadcaster = condition_broadcaster
+        self.station_index = station_index
+        self.station_conditions_loader = create_station_conditions_loader(db)
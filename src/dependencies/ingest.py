@@ -0,0 +1,28 @@
+from typing import Optional
+
+from fastapi.requests import HTTPConnection
+
+from src.ingest.broadcast import ConditionBroadcaster
+from src.ingest.buffer import IngestBuffer
+from src.ingest.latest import LatestConditions
+from src.ingest.writer import ConditionWriter
+
+
+def get_condition_writer(connection: HTTPConnection) -> ConditionWriter:
+    """Station conditions writer dependency - returns the instance created on application startup"""
+    return connection.app.state.condition_writer
+
+
+def get_ingest_buffer(connection: HTTPConnection) -> Optional[IngestBuffer]:
+    """Write-behind ingest buffer dependency - `None` when buffering is disabled"""
+    return connection.app.state.ingest_buffer
+
+
+def get_latest_conditions(connection: HTTPConnection) -> LatestConditions:
+    """Most recent condition of each station - returns the instance created on application startup"""
+    return connection.app.state.latest_conditions
+
+
+def get_condition_broadcaster(connection: HTTPConnection) -> ConditionBroadcaster:
+    """Stored conditions fan-out to subscriptions - returns the instance created on application startup"""
+    return connection.app.state.condition_broadcaster
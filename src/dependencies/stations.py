@@ -0,0 +1,10 @@
+from typing import Optional
+
+from fastapi.requests import HTTPConnection
+
+from src.graphql_api.spatial import StationIndex
+
+
+def get_station_index(connection: HTTPConnection) -> Optional[StationIndex]:
+    """Station locations index dependency - `None` when the index is disabled"""
+    return connection.app.state.station_index
@@ -0,0 +1,151 @@
+"""Per station time bucketed aggregates of station conditions
+
+TimescaleDB computes buckets with `time_bucket` and `first`/`last` aggregates, other databases (plain PostgreSQL,
+SQLite in tests) use epoch arithmetic and window functions giving the same results.
+"""
+
+import datetime
+import enum
+from typing import Any, Optional
+
+import strawberry
+from sqlalchemy import Integer, TIMESTAMP, cast, func, literal_column, select
+from sqlalchemy.sql import ColumnElement, Select
+
+from src import models
+from src.graphql_api.pagination import filter_conditions
+
+AGGREGATED_COLUMNS = ("temperature", "humidity", "pressure", "battery_percentage")
+
+
+@strawberry.enum(description="Aggregation bucket width")
+class AggregateBucket(enum.Enum):
+    MINUTE = 60
+    FIVE_MINUTES = 5 * 60
+    FIFTEEN_MINUTES = 15 * 60
+    HOUR = 60 * 60
+    SIX_HOURS = 6 * 60 * 60
+    DAY = 24 * 60 * 60
+    WEEK = 7 * 24 * 60 * 60
+
+
+@strawberry.enum
+class AggregateFunction(enum.Enum):
+    MIN = "min"
+    MAX = "max"
+    AVG = "avg"
+    COUNT = "count"  # conditions with value
+    FIRST = "first"  # value of the oldest condition in bucket
+    LAST = "last"  # value of the most recent condition in bucket
+
+
+@strawberry.type(description="Aggregated values, only requested functions are set")
+class AggregateValues:
+    min: Optional[float] = None
+    max: Optional[float] = None
+    avg: Optional[float] = None
+    count: Optional[int] = None
+    first: Optional[float] = None
+    last: Optional[float] = None
+
+
+@strawberry.type
+class ConditionsAggregate:
+    resource_id: int
+    bucket: datetime.datetime  # bucket start
+    temperature: AggregateValues
+    humidity: AggregateValues
+    pressure: AggregateValues
+    battery_percentage: AggregateValues
+
+    @staticmethod
+    def from_row(row: Any, functions: list[AggregateFunction]) -> "ConditionsAggregate":
+        values = {
+            column: AggregateValues(**{function.value: row[f"{column}_{function.value}"] for function in functions})
+            for column in AGGREGATED_COLUMNS
+        }
+        return ConditionsAggregate(resource_id=row["station_id"], bucket=row["bucket"], **values)
+
+
+def bucket_expression(
+    dialect_name: str, timescaledb: bool, bucket: AggregateBucket, time: ColumnElement
+) -> ColumnElement:
+    """Start of the bucket `time` falls into, buckets are aligned to UTC midnight
+
+    Constants are rendered inline so the expression in GROUP BY is the same as in selected columns.
+    """
+
+    if timescaledb:
+        return func.time_bucket(literal_column(f"INTERVAL '{bucket.value} seconds'"), time)
+
+    seconds = literal_column(str(bucket.value))
+    if dialect_name == "postgresql":
+        epoch = func.floor(func.extract("epoch", time) / seconds) * seconds
+        return func.timezone(literal_column("'UTC'"), func.to_timestamp(epoch), type_=TIMESTAMP)
+
+    epoch = cast(func.strftime(literal_column("'%s'"), time), Integer) / seconds * seconds
+    return func.datetime(epoch, literal_column("'unixepoch'"), type_=TIMESTAMP)
+
+
+def aggregates_query(
+    dialect_name: str,
+    timescaledb: bool,
+    bucket: AggregateBucket,
+    functions: list[AggregateFunction],
+    station_ids: Optional[list[int]] = None,
+    time_from: Optional[datetime.datetime] = None,
+    time_to: Optional[datetime.datetime] = None,
+) -> Select:
+    """Aggregates per station and bucket, columns `station_id`, `bucket` and `<column>_<function>`"""
+
+    condition = models.StationCondition
+    if timescaledb:
+        source = condition.__table__
+        aggregates = {
+            AggregateFunction.FIRST: lambda column: func.first(source.c[column], source.c.time),
+            AggregateFunction.LAST: lambda column: func.last(source.c[column], source.c.time),
+        }
+    else:
+        # first/last values are picked by window functions, min() of the same values per bucket keeps them
+        window = dict(
+            partition_by=(condition.station_id, bucket_expression(dialect_name, False, bucket, condition.time)),
+            order_by=condition.time,
+            rows=(None, None),
+        )
+        columns = [getattr(condition, column) for column in AGGREGATED_COLUMNS]
+        source = select(
+            condition.station_id,
+            condition.time,
+            *columns,
+            *[func.first_value(column).over(**window).label(f"{column.name}_first") for column in columns],
+            *[func.last_value(column).over(**window).label(f"{column.name}_last") for column in columns],
+        )
+        source = filter_conditions(source, station_ids, time_from, time_to).subquery()
+        aggregates = {
+            AggregateFunction.FIRST: lambda column: func.min(source.c[f"{column}_first"]),
+            AggregateFunction.LAST: lambda column: func.min(source.c[f"{column}_last"]),
+        }
+
+    aggregates.update(
+        {
+            AggregateFunction.MIN: lambda column: func.min(source.c[column]),
+            AggregateFunction.MAX: lambda column: func.max(source.c[column]),
+            AggregateFunction.AVG: lambda column: func.avg(source.c[column]),
+            AggregateFunction.COUNT: lambda column: func.count(source.c[column]),
+        }
+    )
+
+    bucket_start = bucket_expression(dialect_name, timescaledb, bucket, source.c.time).label("bucket")
+    query = select(
+        source.c.station_id,
+        bucket_start,
+        *[
+            aggregates[function](column).label(f"{column}_{function.value}")
+            for column in AGGREGATED_COLUMNS
+            for function in functions
+        ],
+    ).select_from(source)
+    if timescaledb:
+        query = filter_conditions(query, station_ids, time_from, time_to)
+
+    return query.group_by(source.c.station_id, bucket_start).order_by(source.c.station_id, bucket_start)
@@ -0,0 +1,73 @@
+import datetime
+from collections import defaultdict
+from functools import partial
+from typing import NamedTuple, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+from strawberry.dataloader import DataLoader
+
+from src import models
+from src.dependencies.database import Database
+from src.graphql_api.pagination import conditions_query
+
+
+class StationConditionsKey(NamedTuple):
+    station_id: int
+    time_from: Optional[datetime.datetime] = None
+    time_to: Optional[datetime.datetime] = None
+    after: Optional[datetime.datetime] = None  # exclusive, unlike `time_from`
+    before: Optional[datetime.datetime] = None  # exclusive, unlike `time_to`
+    first: Optional[int] = None  # only the oldest conditions
+    last: Optional[int] = None  # only the most recent conditions
+
+
+async def load_station_conditions(
+    db: Database, keys: list[StationConditionsKey]
+) -> list[list[models.StationCondition]]:
+    """Loads conditions of all requested stations with one query per distinct filter (usually just one)"""
+
+    stations_by_filter = defaultdict(list)
+    for key in keys:
+        stations_by_filter[key._replace(station_id=None)].append(key.station_id)
+
+    conditions = defaultdict(list)
+    async with db.session() as session:
+        for condition_filter, station_ids in stations_by_filter.items():
+            query = station_conditions_query(station_ids, condition_filter)
+            result = await session.execute(query)
+            for condition in result.scalars():
+                conditions[condition_filter._replace(station_id=condition.station_id)].append(condition)
+
+    return [conditions[key] for key in keys]
+
+
+def station_conditions_query(station_ids: list[int], condition_filter: StationConditionsKey):
+    """Conditions of given stations ordered by station and time, served by `ix_station_id_time` index"""
+
+    query = conditions_query(station_ids, condition_filter.time_from, condition_filter.time_to)
+    if condition_filter.after:
+        query = query.where(models.StationCondition.time > condition_filter.after)
+    if condition_filter.before:
+        query = query.where(models.StationCondition.time < condition_filter.before)
+
+    limit = condition_filter.first or condition_filter.last
+    if not limit:
+        return query.order_by(models.StationCondition.station_id, models.StationCondition.time)
+
+    order_by = models.StationCondition.time if condition_filter.first else models.StationCondition.time.desc()
+    position = (
+        func.row_number().over(partition_by=models.StationCondition.station_id, order_by=order_by).label("position")
+    )
+    ranked = query.add_columns(position).subquery()
+    ranked_condition = aliased(models.StationCondition, ranked)
+    return (
+        select(ranked_condition)
+        .where(ranked.c.position <= limit)
+        .order_by(ranked_condition.station_id, ranked_condition.time)
+    )
+
+
+def create_station_conditions_loader(db: Database) -> DataLoader[StationConditionsKey, list[models.StationCondition]]:
+    """Per request loader - batches `WeatherStation.weather_station_conditions` resolvers into single query"""
+    return DataLoader(load_fn=partial(load_station_conditions, db))
@@ -0,0 +1,140 @@
+"""Relay style keyset pagination of station conditions
+
+Cursors encode the `(time, station_id)` key of a condition, pages are selected by comparing against it, so any page
+costs the same as the first one.
+"""
+
+import base64
+import binascii
+import datetime
+from typing import NamedTuple, Optional
+
+import strawberry
+from sqlalchemy import select, tuple_
+from sqlalchemy.sql import Select
+
+from src import models
+
+
+class ConditionCursor(NamedTuple):
+    time: datetime.datetime
+    station_id: int
+
+
+def encode_cursor(condition: models.StationCondition) -> str:
+    value = f"{condition.time.isoformat()}|{condition.station_id}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> ConditionCursor:
+    try:
+        time, station_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return ConditionCursor(time=datetime.datetime.fromisoformat(time), station_id=int(station_id))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor '{cursor}'.")
+
+
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    has_previous_page: bool
+    start_cursor: Optional[str] = None
+    end_cursor: Optional[str] = None
+
+
+class PageArguments(NamedTuple):
+    """Validated `first/after` or `last/before` arguments"""
+
+    first: Optional[int] = None
+    after: Optional[ConditionCursor] = None
+    last: Optional[int] = None
+    before: Optional[ConditionCursor] = None
+
+    @property
+    def backward(self) -> bool:
+        return self.last is not None
+
+    @property
+    def size(self) -> int:
+        return self.last if self.backward else self.first
+
+
+def page_arguments(
+    max_page_size: int,
+    first: Optional[int] = None,
+    after: Optional[str] = None,
+    last: Optional[int] = None,
+    before: Optional[str] = None,
+) -> PageArguments:
+    """Validates pagination arguments, page size defaults to `max_page_size`"""
+
+    if first is not None and last is not None:
+        raise ValueError("Arguments 'first' and 'last' can't be combined.")
+    size = first if last is None else last
+    if size is not None and not 0 < size <= max_page_size:
+        raise ValueError(f"Page size must be between 1 and {max_page_size}.")
+
+    if last is not None:
+        return PageArguments(last=last, before=decode_cursor(before) if before else None)
+    return PageArguments(first=first or max_page_size, after=decode_cursor(after) if after else None)
+
+
+def conditions_page_query(query: Select, page: PageArguments) -> Select:
+    """Limits filtered `models.StationCondition` query to one page plus one condition to detect following page"""
+
+    key = tuple_(models.StationCondition.time, models.StationCondition.station_id)
+    if page.backward:
+        if page.before:
+            query = query.where(key < tuple_(*page.before))
+        order_by = (models.StationCondition.time.desc(), models.StationCondition.station_id.desc())
+    else:
+        if page.after:
+            query = query.where(key > tuple_(*page.after))
+        order_by = (models.StationCondition.time, models.StationCondition.station_id)
+
+    return query.order_by(*order_by).limit(page.size + 1)
+
+
+def filter_conditions(
+    query: Select,
+    station_ids: Optional[list[int]] = None,
+    time_from: Optional[datetime.datetime] = None,
+    time_to: Optional[datetime.datetime] = None,
+) -> Select:
+    """Filters query of `models.StationCondition` columns by stations and time (from/to included)"""
+
+    if station_ids is not None:
+        query = query.where(models.StationCondition.station_id.in_(station_ids))
+    if time_from:
+        query = query.where(models.StationCondition.time >= time_from)
+    if time_to:
+        query = query.where(models.StationCondition.time <= time_to)
+    return query
+
+
+def conditions_query(
+    station_ids: Optional[list[int]] = None,
+    time_from: Optional[datetime.datetime] = None,
+    time_to: Optional[datetime.datetime] = None,
+) -> Select:
+    return filter_conditions(select(models.StationCondition), station_ids, time_from, time_to)
+
+
+def page_conditions(
+    conditions: list[models.StationCondition], page: PageArguments
+) -> tuple[list[models.StationCondition], PageInfo]:
+    """Trims time ordered conditions loaded with one extra condition (see `conditions_page_query`) to the page"""
+
+    has_more = len(conditions) > page.size
+    if page.backward:
+        oldest = max(len(conditions) - page.size, 0)
+        conditions = conditions[oldest:]
+        page_info = PageInfo(has_next_page=page.before is not None, has_previous_page=has_more)
+    else:
+        conditions = conditions[: page.size]
+        page_info = PageInfo(has_next_page=has_more, has_previous_page=page.after is not None)
+
+    if conditions:
+        page_info.start_cursor = encode_cursor(conditions[0])
+        page_info.end_cursor = encode_cursor(conditions[-1])
+    return conditions, page_info
@@ -31,3 +31,12 @@ class IsAuthenticated(BasePermission):
         if user:
             info.context.request.auth_user = user
             return True
+
+
+class IsAdmin(IsAuthenticated):
+    message = "User is not an administrator"
+
+    async def has_permission(self, source: typing.Any, info: Info[AppContext, typing.Any], **kwargs) -> bool:
+        if not await super().has_permission(source, info, **kwargs):
+            return False
+        return info.context.request.auth_user.is_admin
@@ -0,0 +1,180 @@
+"""Answering aggregate queries from TimescaleDB continuous aggregates (rollups)
+
+Rollups are created by `555e09bb1580_continuous_aggregates_rollups` migration and hold mergeable partial aggregates
+(min, max, sum, count, first, last) per station and hour/day. Requested buckets are computed from the coarsest rollup
+whose width divides the bucket. Raw conditions are used for parts of the time filter not aligned to the rollup
+buckets and for the recent edge which isn't materialized yet (after rollup watermark).
+"""
+
+import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import TIMESTAMP, Integer, and_, cast, column, func, literal_column, or_, select, table, text, union_all
+from sqlalchemy.sql import ColumnElement, Select
+
+from src import models
+from src.dependencies.database import Database
+from src.graphql_api.aggregates import AGGREGATED_COLUMNS
+from src.graphql_api.aggregates import AggregateBucket
+from src.graphql_api.aggregates import AggregateFunction
+from src.graphql_api.aggregates import bucket_expression
+from src.graphql_api.pagination import filter_conditions
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+PARTIAL_AGGREGATES = ("min", "max", "sum", "count", "first", "last")
+
+
+class Rollup(NamedTuple):
+    view: str
+    seconds: int  # bucket width
+
+    @property
+    def width(self) -> ColumnElement:
+        return literal_column(f"INTERVAL '{self.seconds} seconds'")
+
+    def floor(self, time: datetime.datetime) -> datetime.datetime:
+        return time - datetime.timedelta(seconds=(time - EPOCH).total_seconds() % self.seconds)
+
+    def ceil(self, time: datetime.datetime) -> datetime.datetime:
+        floor = self.floor(time)
+        return floor if floor == time else floor + datetime.timedelta(seconds=self.seconds)
+
+
+ROLLUPS = (  # coarsest first
+    Rollup("weather_daily", 24 * 60 * 60),
+    Rollup("weather_hourly", 60 * 60),
+)
+
+
+def pick_rollup(bucket: AggregateBucket, views: frozenset[str]) -> Optional[Rollup]:
+    """The coarsest existing rollup whose buckets merge into `bucket`"""
+
+    for rollup in ROLLUPS:
+        if rollup.view in views and bucket.value % rollup.seconds == 0:
+            return rollup
+    return None
+
+
+def rollup_table(rollup: Rollup):
+    columns = [f"{name}_{aggregate}" for name in AGGREGATED_COLUMNS for aggregate in PARTIAL_AGGREGATES]
+    return table(
+        rollup.view,
+        column("station_id", Integer),
+        column("bucket", TIMESTAMP),
+        column("first_time", TIMESTAMP),
+        column("last_time", TIMESTAMP),
+        *[column(name) for name in columns],
+    )
+
+
+def raw_partials(bucket: AggregateBucket) -> Select:
+    """Partial aggregates of raw conditions, same columns as rollup view"""
+
+    condition = models.StationCondition
+    bucket_start = bucket_expression("postgresql", True, bucket, condition.time)
+    partials = []
+    for name in AGGREGATED_COLUMNS:
+        value = getattr(condition, name)
+        partials += [
+            func.min(value).label(f"{name}_min"),
+            func.max(value).label(f"{name}_max"),
+            func.sum(value).label(f"{name}_sum"),
+            func.count(value).label(f"{name}_count"),
+            func.first(value, condition.time).label(f"{name}_first"),
+            func.last(value, condition.time).label(f"{name}_last"),
+        ]
+    return select(
+        condition.station_id,
+        bucket_start.label("bucket"),
+        func.min(condition.time).label("first_time"),
+        func.max(condition.time).label("last_time"),
+        *partials,
+    ).group_by(condition.station_id, bucket_start)
+
+
+def rollup_aggregates_query(
+    rollup: Rollup,
+    bucket: AggregateBucket,
+    functions: list[AggregateFunction],
+    station_ids: Optional[list[int]] = None,
+    time_from: Optional[datetime.datetime] = None,
+    time_to: Optional[datetime.datetime] = None,
+) -> Select:
+    """Same result as `aggregates.aggregates_query`, computed from rollup and raw conditions"""
+
+    view = rollup_table(rollup)
+    watermark = select(
+        func.coalesce(func.max(view.c.bucket) + rollup.width, literal_column("'-infinity'::timestamp"))
+    ).scalar_subquery()
+
+    # Rollup buckets completely inside time filter and already materialized
+    rollup_until = watermark if time_to is None else func.least(rollup.floor(time_to), watermark)
+    rollup_range = [view.c.bucket < rollup_until]
+    raw_range = [models.StationCondition.time >= rollup_until]
+    if time_from is not None:
+        rollup_range.append(view.c.bucket >= rollup.ceil(time_from))
+        raw_range.append(models.StationCondition.time < rollup.ceil(time_from))
+
+    rollup_partials = select(
+        view.c.station_id,
+        bucket_expression("postgresql", True, bucket, view.c.bucket).label("bucket"),
+        *[c for c in view.c if c.name not in ("station_id", "bucket")],
+    ).where(and_(*rollup_range))
+    if station_ids is not None:
+        rollup_partials = rollup_partials.where(view.c.station_id.in_(station_ids))
+
+    raw = filter_conditions(raw_partials(bucket), station_ids, time_from, time_to).where(or_(*raw_range))
+    partials = union_all(rollup_partials, raw).subquery()
+
+    merged = {
+        AggregateFunction.MIN: lambda name: func.min(partials.c[f"{name}_min"]),
+        AggregateFunction.MAX: lambda name: func.max(partials.c[f"{name}_max"]),
+        AggregateFunction.AVG: lambda name: (
+            func.sum(partials.c[f"{name}_sum"]) / func.nullif(func.sum(partials.c[f"{name}_count"]), 0)
+        ),
+        AggregateFunction.COUNT: lambda name: cast(func.sum(partials.c[f"{name}_count"]), Integer),
+        AggregateFunction.FIRST: lambda name: func.first(partials.c[f"{name}_first"], partials.c.first_time),
+        AggregateFunction.LAST: lambda name: func.last(partials.c[f"{name}_last"], partials.c.last_time),
+    }
+    return (
+        select(
+            partials.c.station_id,
+            partials.c.bucket,
+            *[
+                merged[function](name).label(f"{name}_{function.value}")
+                for name in AGGREGATED_COLUMNS
+                for function in functions
+            ],
+        )
+        .group_by(partials.c.station_id, partials.c.bucket)
+        .order_by(partials.c.station_id, partials.c.bucket)
+    )
+
+
+def utc_naive(time: datetime.datetime) -> datetime.datetime:
+    """Conditions are stored as naive UTC times"""
+    if time.tzinfo is None:
+        return time
+    return time.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+async def refresh_rollups(db: Database, time_from: datetime.datetime, time_to: datetime.datetime) -> None:
+    """Materializes rollup buckets of given time range, needed after importing conditions older than refresh policy"""
+
+    views = await db.continuous_aggregates()
+    rollups = [rollup for rollup in ROLLUPS if rollup.view in views]
+    if not rollups:
+        return
+
+    time_from, time_to = utc_naive(time_from), utc_naive(time_to)
+    # Refresh can't run in transaction, window is aligned to the coarsest rollup so it covers whole buckets
+    window_start, window_end = ROLLUPS[0].floor(time_from), ROLLUPS[0].ceil(time_to + datetime.timedelta(seconds=1))
+    async with db.engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        for rollup in rollups:
+            query = text(
+                f"CALL refresh_continuous_aggregate('{rollup.view}', "
+                "CAST(:window_start AS TIMESTAMP), CAST(:window_end AS TIMESTAMP))"
+            )
+            await connection.execute(query, {"window_start": window_start, "window_end": window_end})
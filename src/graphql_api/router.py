@@ -0,0 +1,47 @@
+from fastapi.responses import ORJSONResponse
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from strawberry.exceptions import MissingQueryError
+from strawberry.fastapi import GraphQLRouter as StrawberryGraphQLRouter
+from strawberry.http import parse_request_data
+from strawberry.schema.exceptions import InvalidOperationTypeError
+from strawberry.types.graphql import OperationType
+
+
+class GraphQLRouter(StrawberryGraphQLRouter):
+    """Strawberry router encoding results with orjson
+
+    Strawberry always renders results with `JSONResponse` (stdlib json), `execute_request` is the same as strawberry's
+    except for the response class.
+    """
+
+    async def execute_request(self, request: Request, response: Response, data: dict, context, root_value) -> Response:
+        try:
+            request_data = parse_request_data(data)
+        except MissingQueryError:
+            missing_query_response = PlainTextResponse(
+                "No GraphQL query found in the request", status_code=status.HTTP_400_BAD_REQUEST
+            )
+            return self._merge_responses(response, missing_query_response)
+
+        allowed_operation_types = OperationType.from_http(request.method)
+        if not self.allow_queries_via_get and request.method == "GET":
+            allowed_operation_types = allowed_operation_types - {OperationType.QUERY}
+
+        try:
+            result = await self.execute(
+                request_data.query,
+                variables=request_data.variables,
+                context=context,
+                operation_name=request_data.operation_name,
+                root_value=root_value,
+                allowed_operation_types=allowed_operation_types,
+            )
+        except InvalidOperationTypeError as error:
+            return PlainTextResponse(
+                error.as_http_error_reason(request.method), status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        response_data = await self.process_result(request, result)
+        return self._merge_responses(response, ORJSONResponse(response_data, status_code=status.HTTP_200_OK))
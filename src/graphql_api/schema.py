@@ -1,5 +1,5 @@
 import datetime
-from typing import Any, Optional, List
+from typing import Any, AsyncGenerator, Optional, List
 
 import strawberry
 from sqlalchemy import select, exists, and_, update
@@ -7,7 +7,32 @@ from strawberry.types import Info
 
 from src import models
 from src.dependencies.context import AppContext
+from src.graphql_api.aggregates import AggregateBucket
+from src.graphql_api.aggregates import AggregateFunction
+from src.graphql_api.aggregates import ConditionsAggregate
+from src.graphql_api.aggregates import aggregates_query
+from src.graphql_api.loaders import StationConditionsKey
+from src.graphql_api.pagination import PageInfo
+from src.graphql_api.pagination import conditions_page_query
+from src.graphql_api.pagination import conditions_query
+from src.graphql_api.pagination import encode_cursor
+from src.graphql_api.pagination import page_arguments
+from src.graphql_api.pagination import page_conditions
+from src.graphql_api.permissions import IsAdmin
 from src.graphql_api.permissions import IsAuthenticated
+from src.graphql_api.rollups import pick_rollup
+from src.graphql_api.rollups import rollup_aggregates_query
+from src.graphql_api.series import ConditionSeries
+from src.graphql_api.series import series_from_rows
+from src.graphql_api.series import series_query
+from src.graphql_api.spatial import Box
+from src.graphql_api.spatial import StationLocation
+from src.graphql_api.spatial import nearest_stations_sql
+from src.graphql_api.spatial import stations_in_box_sql
+from src.graphql_api.spatial import stations_near_sql
+from src.graphql_api.storage import HypertableStorage
+from src.graphql_api.storage import hypertable_storage
+from src.ingest.writer import ConditionRecord
 
 
 @strawberry.type
@@ -16,6 +41,25 @@ class Location:
     lat: float
 
 
+@strawberry.input(description="Lets users filter based on time (from/to included)")
+class TimeFilter:
+    """Filtering time from/to (included)"""
+
+    time_from: Optional[datetime.datetime] = None
+    time_to: Optional[datetime.datetime] = None
+
+
+@strawberry.input(description="Area between corners (included)")
+class BoundingBox:
+    min_long: float
+    min_lat: float
+    max_long: float
+    max_lat: float
+
+    def to_box(self) -> Box:
+        return Box(min_long=self.min_long, min_lat=self.min_lat, max_long=self.max_long, max_lat=self.max_lat)
+
+
 @strawberry.type
 class WeatherStation:
     resource_id: int
@@ -28,18 +72,60 @@ class WeatherStation:
             location=Location(lat=model.latitude, long=model.longitude),
         )
 
+    @staticmethod
+    def from_location(station: StationLocation) -> "WeatherStation":
+        return WeatherStation(resource_id=station.station_id, location=Location(lat=station.lat, long=station.long))
+
+    @strawberry.field(description="The most recent condition, served from memory")
+    def latest_condition(self, info: Info[AppContext, Any]) -> Optional["StationCondition"]:
+        record = info.context.latest_conditions.get(self.resource_id)
+        return StationCondition.from_record(record) if record else None
+
     @strawberry.field
     async def weather_station_conditions(
         self,
         info: Info[AppContext, Any],
+        time_filter: Optional[TimeFilter] = None,
+        last: Optional[int] = None,
     ) -> List["StationCondition"]:
-        async with info.context.db.session() as session:
-            query = select(models.StationCondition).where(models.StationCondition.station_id == self.resource_id)
-            result = await session.execute(query)
-            station_conditions = result.scalars()
+        """Conditions ordered by time, `last` limits them to the most recent ones"""
+        if last is not None and last < 1:
+            raise ValueError("Argument 'last' must be positive.")
+
+        key = StationConditionsKey(
+            station_id=self.resource_id,
+            time_from=time_filter.time_from if time_filter else None,
+            time_to=time_filter.time_to if time_filter else None,
+            last=last,
+        )
+        station_conditions = await info.context.station_conditions_loader.load(key)
 
         return [StationCondition.from_model(condition) for condition in station_conditions]
 
+    @strawberry.field(description="Conditions paginated by time.")
+    async def weather_station_conditions_connection(
+        self,
+        info: Info[AppContext, Any],
+        time_filter: Optional[TimeFilter] = None,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+    ) -> "StationConditionConnection":
+        page = page_arguments(info.context.config.GRAPHQL_MAX_PAGE_SIZE, first, after, last, before)
+        key = StationConditionsKey(
+            station_id=self.resource_id,
+            time_from=time_filter.time_from if time_filter else None,
+            time_to=time_filter.time_to if time_filter else None,
+            after=page.after.time if page.after else None,
+            before=page.before.time if page.before else None,
+            first=None if page.backward else page.first + 1,  # extra condition tells whether there is next page
+            last=page.last + 1 if page.backward else None,
+        )
+        station_conditions = await info.context.station_conditions_loader.load(key)
+
+        return StationConditionConnection.from_models(*page_conditions(station_conditions, page))
+
 
 @strawberry.type
 class StationCondition:
@@ -61,13 +147,51 @@ class StationCondition:
             pressure=station_condition.pressure,
         )
 
+    @staticmethod
+    def from_record(record: ConditionRecord) -> "StationCondition":
+        time, station_id, battery_percentage, temperature, humidity, pressure = record
+        return StationCondition(
+            time=time,
+            resource_id=station_id,
+            battery_percentage=battery_percentage,
+            temperature=temperature,
+            humidity=humidity,
+            pressure=pressure,
+        )
 
-@strawberry.input(description="Lets users filter based on time (from/to included)")
-class TimeFilter:
-    """Filtering time from/to (included)"""
 
-    time_from: Optional[datetime.datetime] = None
-    time_to: Optional[datetime.datetime] = None
+@strawberry.type
+class NearbyStation:
+    weather_station: WeatherStation
+    distance_km: float
+
+    @staticmethod
+    def from_location(station: StationLocation) -> "NearbyStation":
+        return NearbyStation(weather_station=WeatherStation.from_location(station), distance_km=station.distance_km)
+
+
+@strawberry.type
+class StationConditionEdge:
+    cursor: str
+    node: StationCondition
+
+
+@strawberry.type
+class StationConditionConnection:
+    edges: List[StationConditionEdge]
+    page_info: PageInfo
+
+    @staticmethod
+    def from_models(
+        station_conditions: List[models.StationCondition], page_info: PageInfo
+    ) -> "StationConditionConnection":
+        return StationConditionConnection(
+            edges=[
+                StationConditionEdge(cursor=encode_cursor(condition), node=StationCondition.from_model(condition))
+                for condition in station_conditions
+            ],
+            page_info=page_info,
+        )
 
 
 @strawberry.type
@@ -127,7 +251,55 @@ class Query:
 
         return [WeatherStation.from_model(station) for station in weather_stations]
 
-    @strawberry.field(description="Get weather data.")
+    @strawberry.field(description="Weather stations in area ordered by id.")
+    async def stations_in_box(self, info: Info[AppContext, Any], bounding_box: BoundingBox) -> List[WeatherStation]:
+        """Box with `minLong` > `maxLong` crosses the antimeridian"""
+        index = info.context.station_index
+        if index is not None:
+            stations = index.in_box(bounding_box.to_box())
+        else:
+            async with info.context.db.session() as session:
+                stations = await stations_in_box_sql(session, bounding_box.to_box())
+
+        return [WeatherStation.from_location(station) for station in stations]
+
+    @strawberry.field(description="Weather stations within radius ordered by distance.")
+    async def stations_near(
+        self, info: Info[AppContext, Any], lat: float, long: float, radius_km: float
+    ) -> List[NearbyStation]:
+        if radius_km <= 0:
+            raise ValueError("Argument 'radiusKm' must be positive.")
+
+        index = info.context.station_index
+        if index is not None:
+            stations = index.near(lat, long, radius_km)
+        else:
+            async with info.context.db.session() as session:
+                stations = await stations_near_sql(session, lat, long, radius_km)
+
+        return [NearbyStation.from_location(station) for station in stations]
+
+    @strawberry.field(description="The nearest weather stations ordered by distance.")
+    async def nearest_stations(
+        self, info: Info[AppContext, Any], lat: float, long: float, k: int
+    ) -> List[NearbyStation]:
+        max_page_size = info.context.config.GRAPHQL_MAX_PAGE_SIZE
+        if not 1 <= k <= max_page_size:
+            raise ValueError(f"Argument 'k' must be between 1 and {max_page_size}.")
+
+        index = info.context.station_index
+        if index is not None:
+            stations = index.nearest(lat, long, k)
+        else:
+            async with info.context.db.session() as session:
+                stations = await nearest_stations_sql(session, lat, long, k)
+
+        return [NearbyStation.from_location(station) for station in stations]
+
+    @strawberry.field(
+        description="Get weather data.",
+        deprecation_reason="Loads all matching conditions at once, use weatherDataConnection.",
+    )
     async def weather_data(
         self, info: Info[AppContext, Any], time_filter: Optional[TimeFilter] = None
     ) -> Optional[List[StationCondition]]:
@@ -150,6 +322,92 @@ class Query:
 
         return [StationCondition.from_model(condition) for condition in weather_conditions]
 
+    @strawberry.field(description="The most recent condition of each station, served from memory.")
+    def current_conditions(
+        self, info: Info[AppContext, Any], station_ids: Optional[List[int]] = None
+    ) -> List[StationCondition]:
+        """Ordered by station, stations without conditions are omitted"""
+        return [StationCondition.from_record(record) for record in info.context.latest_conditions.all(station_ids)]
+
+    @strawberry.field(description="Conditions of stations as columns, for bulk time series reads.")
+    async def weather_series(
+        self,
+        info: Info[AppContext, Any],
+        station_ids: Optional[List[int]] = None,
+        time_filter: Optional[TimeFilter] = None,
+    ) -> List[ConditionSeries]:
+        """Stations ordered by id, stations without conditions are omitted"""
+        max_points = info.context.config.GRAPHQL_MAX_SERIES_POINTS
+        query = series_query(
+            station_ids,
+            time_from=time_filter.time_from if time_filter else None,
+            time_to=time_filter.time_to if time_filter else None,
+        )
+        async with info.context.db.session() as session:
+            result = await session.execute(query.limit(max_points + 1))
+            rows = result.all()
+
+        if len(rows) > max_points:
+            raise ValueError(f"More than {max_points} conditions - use narrower time filter or fewer stations.")
+        return series_from_rows(rows)
+
+    @strawberry.field(description="Get weather data page by page, ordered by time and station.")
+    async def weather_data_connection(
+        self,
+        info: Info[AppContext, Any],
+        station_ids: Optional[List[int]] = None,
+        time_filter: Optional[TimeFilter] = None,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+    ) -> StationConditionConnection:
+        page = page_arguments(info.context.config.GRAPHQL_MAX_PAGE_SIZE, first, after, last, before)
+        async with info.context.db.session() as session:
+            query = conditions_query(
+                station_ids,
+                time_from=time_filter.time_from if time_filter else None,
+                time_to=time_filter.time_to if time_filter else None,
+            )
+            result = await session.execute(conditions_page_query(query, page))
+            weather_conditions = result.scalars().all()
+
+        if page.backward:
+            weather_conditions.reverse()  # loaded from the most recent
+        return StationConditionConnection.from_models(*page_conditions(weather_conditions, page))
+
+    @strawberry.field(description="Get weather data aggregated per station and time bucket.")
+    async def weather_aggregates(
+        self,
+        info: Info[AppContext, Any],
+        bucket: AggregateBucket,
+        station_ids: Optional[List[int]] = None,
+        time_filter: Optional[TimeFilter] = None,
+        functions: Optional[List[AggregateFunction]] = None,
+    ) -> List[ConditionsAggregate]:
+        """Buckets ordered by station and time, all aggregate functions are computed by default"""
+        functions = functions or list(AggregateFunction)
+        max_buckets = info.context.config.GRAPHQL_MAX_AGGREGATE_BUCKETS
+
+        db = info.context.db
+        time_from = time_filter.time_from if time_filter else None
+        time_to = time_filter.time_to if time_filter else None
+        timescaledb = await db.timescaledb_available()
+        rollup = pick_rollup(bucket, await db.continuous_aggregates()) if timescaledb else None
+        if rollup:
+            query = rollup_aggregates_query(rollup, bucket, functions, station_ids, time_from, time_to)
+        else:
+            query = aggregates_query(
+                db.engine.dialect.name, timescaledb, bucket, functions, station_ids, time_from, time_to
+            )
+        async with db.session() as session:
+            result = await session.execute(query.limit(max_buckets + 1))
+            aggregates = result.mappings().all()
+
+        if len(aggregates) > max_buckets:
+            raise ValueError(f"More than {max_buckets} buckets - use larger bucket or narrower time filter.")
+        return [ConditionsAggregate.from_row(aggregate, functions) for aggregate in aggregates]
+
 
 @strawberry.type
 class Mutation:
@@ -188,9 +446,13 @@ class Mutation:
             )
             session.add(new_weather_station)
 
+        info.context.api_key_cache.invalidate(new_weather_station.api_key)  # may be cached as unknown key
+        if info.context.station_index is not None:
+            info.context.station_index.add(
+                new_weather_station.station_id, new_weather_station.longitude, new_weather_station.latitude
+            )
         return WeatherStation.from_model(new_weather_station)
 
-
     @strawberry.mutation(description="Remove weather station.", permission_classes=[IsAuthenticated])
     async def remove_weather_station(self, info: Info[AppContext, Any], resource_id: int) -> RemoveWeatherStationOutput:
         """Delete weather station from DB"""
@@ -199,23 +461,29 @@ class Mutation:
             result = await session.execute(query)
             weather_station = result.scalar()
 
-            if weather_station:
-                auth_user = info.context.request.auth_user
-                # Check if deleting own station
-                if weather_station.user_id != auth_user.id:
-                    return RemoveWeatherStationOutput(
-                        resource_id=weather_station.station_id,
-                        message="Cannot remove foreign weather station!",
-                        resource_removed=False,
-                    )
+            if not weather_station:
+                return RemoveWeatherStationOutput(
+                    resource_id=resource_id, resource_removed=False, message="Weather station not found."
+                )
 
-                await session.delete(weather_station)
+            auth_user = info.context.request.auth_user
+            # Check if deleting own station
+            if weather_station.user_id != auth_user.id:
                 return RemoveWeatherStationOutput(
-                    resource_id=resource_id, resource_removed=True, message="Weather station successfully removed."
+                    resource_id=weather_station.station_id,
+                    message="Cannot remove foreign weather station!",
+                    resource_removed=False,
                 )
-            return RemoveWeatherStationOutput(
-                resource_id=resource_id, resource_removed=False, message="Weather station not found."
-            )
+
+            await session.delete(weather_station)
+
+        info.context.api_key_cache.invalidate(weather_station.api_key)
+        info.context.latest_conditions.remove(resource_id)
+        if info.context.station_index is not None:
+            info.context.station_index.remove(resource_id)
+        return RemoveWeatherStationOutput(
+            resource_id=resource_id, resource_removed=True, message="Weather station successfully removed."
+        )
 
     @strawberry.mutation(description="Update weather station", permission_classes=[IsAuthenticated])
     async def update_weather_station(
@@ -232,42 +500,81 @@ class Mutation:
             )
             result = await session.execute(query)
             weather_station_exists = result.scalar()
-            if weather_station_exists:
-                query = select(models.WeatherStation).where(
-                    models.WeatherStation.station_id == weather_station_update.station_id
+            if not weather_station_exists:
+                return UpdateStationOutput(
+                    resource_id=weather_station_update.station_id,
+                    message="Station not found.",
+                    resource_updated=False,
                 )
-                result = await session.execute(query)
-                weather_station = result.scalar()
-
-                auth_user = info.context.request.auth_user
-                if weather_station.user_id != auth_user.id:
-                    return UpdateStationOutput(
-                        resource_id=weather_station.station_id,
-                        message="Cannot update foreign weather station!",
-                        resource_updated=False,
-                    )
-                if not weather_station_update.as_dict():
-                    return UpdateStationOutput(
-                        resource_id=weather_station.station_id,
-                        message="Nothing to update",
-                        resource_updated=False,
-                    )
-                query = (
-                    update(models.WeatherStation)
-                    .where(models.WeatherStation.station_id == weather_station.station_id)
-                    .values(**weather_station_update.as_dict())
+
+            query = select(models.WeatherStation).where(
+                models.WeatherStation.station_id == weather_station_update.station_id
+            )
+            result = await session.execute(query)
+            weather_station = result.scalar()
+
+            auth_user = info.context.request.auth_user
+            if weather_station.user_id != auth_user.id:
+                return UpdateStationOutput(
+                    resource_id=weather_station.station_id,
+                    message="Cannot update foreign weather station!",
+                    resource_updated=False,
                 )
-                await session.execute(query)
+            if not weather_station_update.as_dict():
                 return UpdateStationOutput(
                     resource_id=weather_station.station_id,
-                    message="Station successfully udpated.",
-                    resource_updated=True,
+                    message="Nothing to update",
+                    resource_updated=False,
                 )
-            return UpdateStationOutput(
-                resource_id=weather_station_update.station_id,
-                message="Station not found.",
-                resource_updated=False,
+            previous_api_key = weather_station.api_key
+            query = (
+                update(models.WeatherStation)
+                .where(models.WeatherStation.station_id == weather_station.station_id)
+                .values(**weather_station_update.as_dict())
+            )
+            await session.execute(query)
+
+        # Old key must stop working, new key may be cached as unknown
+        info.context.api_key_cache.invalidate(previous_api_key, weather_station_update.api_key)
+        if info.context.station_index is not None:  # station is synchronized with the update
+            info.context.station_index.add(
+                weather_station.station_id, weather_station.longitude, weather_station.latitude
             )
+        return UpdateStationOutput(
+            resource_id=weather_station.station_id,
+            message="Station successfully udpated.",
+            resource_updated=True,
+        )
+
+    @strawberry.mutation(description="Inspect conditions storage (chunks, compression).", permission_classes=[IsAdmin])
+    async def hypertable_storage(self, info: Info[AppContext, Any]) -> HypertableStorage:
+        """Chunk sizes and compression statistics, TimescaleDB only"""
+        return await hypertable_storage(info.context.db)
 
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
+@strawberry.type
+class Subscription:
+    @strawberry.subscription(description="Conditions stored from now on, filtered by stations and/or area.")
+    async def station_conditions(
+        self,
+        info: Info[AppContext, Any],
+        station_ids: Optional[List[int]] = None,
+        bounding_box: Optional[BoundingBox] = None,
+    ) -> AsyncGenerator[StationCondition, None]:
+        """Stations in `bounding_box` are resolved when subscribing, slow subscribers may miss conditions"""
+        subscribed = frozenset(station_ids) if station_ids is not None else None
+        if bounding_box:
+            index = info.context.station_index
+            if index is not None:
+                stations = index.in_box(bounding_box.to_box())
+            else:
+                async with info.context.db.session() as session:
+                    stations = await stations_in_box_sql(session, bounding_box.to_box())
+            in_box = frozenset(station.station_id for station in stations)
+            subscribed = in_box if subscribed is None else subscribed & in_box
+
+        async for record in info.context.condition_broadcaster.subscribe(subscribed):
+            yield StationCondition.from_record(record)
+
+
+schema = strawberry.Schema(query=Query, mutation=Mutation, subscription=Subscription)
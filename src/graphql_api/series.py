@@ -0,0 +1,70 @@
+"""Columnar (struct of arrays) conditions of stations
+
+Values of each column are returned as a single list scalar, GraphQL serializes one value per station and column
+instead of an object with six fields per condition. Rows are read as tuples, no ORM objects are created.
+"""
+
+import datetime
+import itertools
+from typing import NewType, Optional
+
+import strawberry
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+from src import models
+from src.graphql_api.pagination import filter_conditions
+from src.ingest.writer import CONDITION_COLUMNS
+
+FloatSeries = strawberry.scalar(
+    NewType("FloatSeries", list),
+    serialize=lambda values: values,
+    parse_value=lambda values: values,
+    description="List of floats, null for missing values",
+)
+TimeSeries = strawberry.scalar(
+    NewType("TimeSeries", list),
+    serialize=lambda values: [value.isoformat() for value in values],
+    parse_value=lambda values: [datetime.datetime.fromisoformat(value) for value in values],
+    description="List of ISO-8601 date-times",
+)
+
+
+@strawberry.type(description="Conditions of a station ordered by time, values at the same index belong together")
+class ConditionSeries:
+    resource_id: int
+    time: TimeSeries
+    battery_percentage: FloatSeries
+    temperature: FloatSeries
+    humidity: FloatSeries
+    pressure: FloatSeries
+
+    @staticmethod
+    def from_rows(station_id: int, rows: list[tuple]) -> "ConditionSeries":
+        times, _, battery_percentage, temperature, humidity, pressure = zip(*rows)
+        return ConditionSeries(
+            resource_id=station_id,
+            time=list(times),
+            battery_percentage=list(battery_percentage),
+            temperature=list(temperature),
+            humidity=list(humidity),
+            pressure=list(pressure),
+        )
+
+
+def series_query(
+    station_ids: Optional[list[int]] = None,
+    time_from: Optional[datetime.datetime] = None,
+    time_to: Optional[datetime.datetime] = None,
+) -> Select:
+    condition = models.StationCondition
+    query = select(*[getattr(condition, name) for name in CONDITION_COLUMNS])
+    return filter_conditions(query, station_ids, time_from, time_to).order_by(condition.station_id, condition.time)
+
+
+def series_from_rows(rows: list[tuple]) -> list[ConditionSeries]:
+    """Rows ordered by station"""
+    return [
+        ConditionSeries.from_rows(station_id, list(station_rows))
+        for station_id, station_rows in itertools.groupby(rows, key=lambda row: row[1])
+    ]
@@ -0,0 +1,198 @@
+"""Station lookup by location - bounding box, radius and k nearest stations
+
+`StationIndex` is an in-memory grid of station coordinates (cells of `cell_degrees`), built on startup and updated
+by station mutations. SQL functions give the same results without the index (plain SQL, no PostGIS): a bounding box
+query narrows candidates and exact great-circle distances are computed in Python.
+"""
+
+import math
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import models
+from src.dependencies.database import Database
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM  # half of the circumference
+
+
+class Box(NamedTuple):
+    """Longitude/latitude range (included), `min_long > max_long` crosses the antimeridian"""
+
+    min_long: float
+    min_lat: float
+    max_long: float
+    max_lat: float
+
+    def split(self) -> list["Box"]:
+        """Boxes not crossing the antimeridian"""
+        if self.min_long <= self.max_long:
+            return [self]
+        return [self._replace(max_long=180.0), self._replace(min_long=-180.0)]
+
+    def contains(self, long: float, lat: float) -> bool:
+        return any(box.min_long <= long <= box.max_long and box.min_lat <= lat <= box.max_lat for box in self.split())
+
+
+class StationLocation(NamedTuple):
+    station_id: int
+    long: float
+    lat: float
+    distance_km: Optional[float] = None  # from the searched point
+
+
+def distance_km(lat: float, long: float, other_lat: float, other_long: float) -> float:
+    """Great-circle (haversine) distance"""
+
+    lat, long, other_lat, other_long = map(math.radians, (lat, long, other_lat, other_long))
+    a = (
+        math.sin((other_lat - lat) / 2) ** 2
+        + math.cos(lat) * math.cos(other_lat) * math.sin((other_long - long) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_box(lat: float, long: float, radius_km: float) -> Box:
+    """Smallest box containing the circle, http://janmatuschek.de/LatitudeLongitudeBoundingCoordinates"""
+
+    angular = radius_km / EARTH_RADIUS_KM
+    min_lat, max_lat = lat - math.degrees(angular), lat + math.degrees(angular)
+    if min_lat <= -90 or max_lat >= 90 or angular >= math.pi / 2:
+        return Box(-180.0, max(min_lat, -90.0), 180.0, min(max_lat, 90.0))  # circle contains a pole
+
+    delta_long = math.degrees(math.asin(math.sin(angular) / math.cos(math.radians(lat))))
+    min_long, max_long = long - delta_long, long + delta_long
+    if min_long < -180:
+        min_long += 360
+    if max_long > 180:
+        max_long -= 360
+    return Box(min_long, min_lat, max_long, max_lat)
+
+
+def nearest_within(
+    lat: float, long: float, candidates: Iterable[StationLocation], radius_km: float
+) -> list[StationLocation]:
+    """Candidates within radius ordered by distance"""
+
+    distances = [
+        candidate._replace(distance_km=distance_km(lat, long, candidate.lat, candidate.long))
+        for candidate in candidates
+    ]
+    return sorted(
+        (station for station in distances if station.distance_km <= radius_km),
+        key=lambda station: (station.distance_km, station.station_id),
+    )
+
+
+class StationIndex:
+    """Grid of station locations"""
+
+    def __init__(self, cell_degrees: float = 1.0):
+        self.cell_degrees = cell_degrees
+        self._locations: dict[int, tuple[float, float]] = {}  # station_id -> (longitude, latitude)
+        self._cells: dict[tuple[int, int], set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    async def seed(self, db: Database) -> None:
+        """Loads all stations with a single query"""
+
+        station = models.WeatherStation
+        async with db.session() as session:
+            result = await session.execute(select(station.station_id, station.longitude, station.latitude))
+            for station_id, long, lat in result:
+                self.add(station_id, long, lat)
+
+    def _cell(self, long: float, lat: float) -> tuple[int, int]:
+        return math.floor(long / self.cell_degrees), math.floor(lat / self.cell_degrees)
+
+    def add(self, station_id: int, long: float, lat: float) -> None:
+        """Adds or moves station"""
+
+        self.remove(station_id)
+        self._locations[station_id] = (long, lat)
+        self._cells.setdefault(self._cell(long, lat), set()).add(station_id)
+
+    def remove(self, station_id: int) -> None:
+        location = self._locations.pop(station_id, None)
+        if location is None:
+            return
+        cell = self._cell(*location)
+        self._cells[cell].discard(station_id)
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+    def _candidates(self, box: Box) -> Iterable[StationLocation]:
+        """Stations in cells overlapping the box"""
+
+        for part in box.split():
+            min_x, min_y = self._cell(part.min_long, part.min_lat)
+            max_x, max_y = self._cell(part.max_long, part.max_lat)
+            if (max_x - min_x + 1) * (max_y - min_y + 1) > len(self._cells):
+                cells = [
+                    stations for (x, y), stations in self._cells.items() if min_x <= x <= max_x and min_y <= y <= max_y
+                ]
+            else:
+                cells = [self._cells.get((x, y), ()) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+            for stations in cells:
+                for station_id in stations:
+                    yield StationLocation(station_id, *self._locations[station_id])
+
+    def in_box(self, box: Box) -> list[StationLocation]:
+        """Stations ordered by id"""
+        return sorted(station for station in self._candidates(box) if box.contains(station.long, station.lat))
+
+    def near(self, lat: float, long: float, radius_km: float) -> list[StationLocation]:
+        """Stations within radius ordered by distance"""
+        return nearest_within(lat, long, self._candidates(radius_box(lat, long, radius_km)), radius_km)
+
+    def nearest(self, lat: float, long: float, k: int) -> list[StationLocation]:
+        """`k` nearest stations, the search radius doubles until enough stations are found"""
+
+        radius_km = self.cell_degrees * 111.0
+        while True:
+            stations = self.near(lat, long, radius_km)
+            if len(stations) >= k or radius_km >= MAX_DISTANCE_KM:
+                return stations[:k]
+            radius_km = min(radius_km * 2, MAX_DISTANCE_KM)
+
+
+def _box_condition(box: Box):
+    station = models.WeatherStation
+    return or_(
+        *[
+            and_(
+                station.longitude.between(part.min_long, part.max_long),
+                station.latitude.between(part.min_lat, part.max_lat),
+            )
+            for part in box.split()
+        ]
+    )
+
+
+async def stations_in_box_sql(session: AsyncSession, box: Box) -> list[StationLocation]:
+    station = models.WeatherStation
+    query = (
+        select(station.station_id, station.longitude, station.latitude)
+        .where(_box_condition(box))
+        .order_by(station.station_id)
+    )
+    result = await session.execute(query)
+    return [StationLocation(*row) for row in result]
+
+
+async def stations_near_sql(session: AsyncSession, lat: float, long: float, radius_km: float) -> list[StationLocation]:
+    candidates = await stations_in_box_sql(session, radius_box(lat, long, radius_km))
+    return nearest_within(lat, long, candidates, radius_km)
+
+
+async def nearest_stations_sql(session: AsyncSession, lat: float, long: float, k: int) -> list[StationLocation]:
+    radius_km = 111.0
+    while True:
+        stations = await stations_near_sql(session, lat, long, radius_km)
+        if len(stations) >= k or radius_km >= MAX_DISTANCE_KM:
+            return stations[:k]
+        radius_km = min(radius_km * 2, MAX_DISTANCE_KM)
@@ -0,0 +1,85 @@
+"""Storage statistics of conditions hypertable - chunks and their native compression (TimescaleDB only)"""
+
+import datetime
+from typing import Optional
+
+import strawberry
+from sqlalchemy import text
+
+from src.dependencies.database import Database
+
+HYPERTABLE = "weather_real_time"
+
+
+@strawberry.type
+class ChunkStorage:
+    chunk_name: str
+    range_start: datetime.datetime
+    range_end: datetime.datetime
+    compressed: bool
+    total_bytes: Optional[int]  # table, indexes and toast, compressed size for compressed chunk
+    before_compression_bytes: Optional[int]
+    after_compression_bytes: Optional[int]
+
+
+@strawberry.type
+class HypertableStorage:
+    hypertable: str
+    chunks: list[ChunkStorage]
+
+    @strawberry.field
+    def total_bytes(self) -> int:
+        return sum(chunk.total_bytes or 0 for chunk in self.chunks)
+
+    @strawberry.field
+    def compressed_chunks(self) -> int:
+        return sum(1 for chunk in self.chunks if chunk.compressed)
+
+    @strawberry.field(description="Size of compressed chunks before / after compression")
+    def compression_ratio(self) -> Optional[float]:
+        compressed = [chunk for chunk in self.chunks if chunk.compressed and chunk.after_compression_bytes]
+        if not compressed:
+            return None
+        before = sum(chunk.before_compression_bytes or 0 for chunk in compressed)
+        return before / sum(chunk.after_compression_bytes for chunk in compressed)
+
+
+CHUNKS_QUERY = text(
+    f"""
+    SELECT chunk.chunk_name,
+           chunk.range_start,
+           chunk.range_end,
+           chunk.is_compressed,
+           size.total_bytes,
+           compression.before_compression_total_bytes,
+           compression.after_compression_total_bytes
+    FROM timescaledb_information.chunks AS chunk
+    LEFT JOIN chunks_detailed_size('{HYPERTABLE}') AS size
+        ON size.chunk_schema = chunk.chunk_schema AND size.chunk_name = chunk.chunk_name
+    LEFT JOIN chunk_compression_stats('{HYPERTABLE}') AS compression
+        ON compression.chunk_schema = chunk.chunk_schema AND compression.chunk_name = chunk.chunk_name
+    WHERE chunk.hypertable_name = '{HYPERTABLE}'
+    ORDER BY chunk.range_start
+    """
+)
+
+
+async def hypertable_storage(db: Database) -> HypertableStorage:
+    if not await db.timescaledb_available():
+        raise ValueError("Storage statistics require TimescaleDB.")
+
+    async with db.session() as session:
+        result = await session.execute(CHUNKS_QUERY)
+        chunks = [
+            ChunkStorage(
+                chunk_name=row.chunk_name,
+                range_start=row.range_start,
+                range_end=row.range_end,
+                compressed=row.is_compressed,
+                total_bytes=row.total_bytes,
+                before_compression_bytes=row.before_compression_total_bytes,
+                after_compression_bytes=row.after_compression_total_bytes,
+            )
+            for row in result
+        ]
+    return HypertableStorage(hypertable=HYPERTABLE, chunks=chunks)
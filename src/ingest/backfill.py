@@ -0,0 +1,281 @@
+"""Offline import of station condition logs (CSV with header row or NDJSON)
+
+Rows are streamed through the pipeline in chunks - memory use doesn't depend on the log size. The CLI stores a
+checkpoint after every stored chunk so an interrupted import can be resumed:
+
+    python -m src.ingest.backfill station_12.csv --station-id 12 --checkpoint station_12.checkpoint
+"""
+
+import argparse
+import asyncio
+import codecs
+import csv
+import datetime
+import enum
+import itertools
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, TypeVar
+
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from src.dependencies.config import get_config
+from src.dependencies.database import create_database
+from src.graphql_api.rollups import refresh_rollups
+from src.ingest.writer import ConditionRecord
+from src.ingest.writer import ConditionWriter
+from src.rest_api.pydantic_data_types import StationCondition
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LogFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class RowParser:
+    """Decodes log lines one by one, CSV header is taken from the first non-blank line"""
+
+    def __init__(self, log_format: LogFormat):
+        self.log_format = log_format
+        self._header: Optional[list[str]] = None
+
+    def parse_line(self, line: str) -> Optional[Any]:
+        """Decoded row, `None` for lines without data (blank lines, CSV header)
+
+        Undecodable NDJSON lines are returned as they are and rejected by validation.
+        """
+
+        if not line.strip():
+            return None
+
+        if self.log_format == LogFormat.NDJSON:
+            try:
+                return json.loads(line)
+            except ValueError:
+                return line
+
+        values = next(csv.reader([line]))
+        if self._header is None:
+            self._header = [name.strip() for name in values]
+            return None
+        return {name: value or None for name, value in zip(self._header, values)}  # empty values are missing
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+async def achunked(iterable: AsyncIterable[T], size: int) -> AsyncIterator[list[T]]:
+    chunk = []
+    async for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def aiter_lines(stream: AsyncIterable[bytes], encoding: str = "utf-8") -> AsyncIterator[str]:
+    """Splits byte stream (ie. request body) into text lines"""
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    remainder = ""
+    async for data in stream:
+        lines = (remainder + decoder.decode(data)).split("\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line
+    remainder += decoder.decode(b"", final=True)
+    if remainder:
+        yield remainder
+
+
+def iter_rows(lines: Iterable[str], parser: RowParser) -> Iterator[Any]:
+    return (row for row in map(parser.parse_line, lines) if row is not None)
+
+
+async def aiter_rows(lines: AsyncIterable[str], parser: RowParser) -> AsyncIterator[Any]:
+    async for line in lines:
+        row = parser.parse_line(line)
+        if row is not None:
+            yield row
+
+
+@dataclass
+class BackfillProgress:
+    rows: int = 0  # rows processed, including rows skipped by resumed import
+    accepted: int = 0
+    rejected: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    time_from: Optional[datetime.datetime] = None  # time range of stored conditions, used to refresh rollups
+    time_to: Optional[datetime.datetime] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.accepted / elapsed if elapsed > 0 else 0.0
+
+
+class BackfillImporter:
+    """Validates rows of a single station in chunks and stores them in bulk
+
+    Rows already processed (see `BackfillProgress.rows`) are skipped, which allows resuming from a checkpoint.
+    """
+
+    def __init__(
+        self,
+        writer: ConditionWriter,
+        station_id: int,
+        chunk_size: int = 5000,
+        progress: Optional[BackfillProgress] = None,
+        report_interval: float = 10.0,
+    ):
+        self.writer = writer
+        self.station_id = station_id
+        self.chunk_size = chunk_size
+        self.progress = progress or BackfillProgress()
+        self.report_interval = report_interval
+        self._reported = time.perf_counter()
+
+    async def import_rows(self, rows: Iterable[Any]) -> BackfillProgress:
+        rows = itertools.islice(rows, self.progress.rows, None)
+        for chunk in chunked(rows, self.chunk_size):
+            await self.import_chunk(chunk)
+        return self.progress
+
+    async def import_rows_stream(self, rows: AsyncIterable[Any]) -> BackfillProgress:
+        async for chunk in achunked(rows, self.chunk_size):
+            await self.import_chunk(chunk)
+        return self.progress
+
+    async def import_chunk(self, rows: list[Any]) -> None:
+        records = self.validate(rows)
+        stored = len(records)
+        try:
+            await self.writer.write(records)
+        except IntegrityError:
+            # Chunk overlaps already stored conditions - store what's possible one by one
+            for record in records:
+                try:
+                    await self.writer.write([record])
+                except IntegrityError:
+                    stored -= 1
+
+        if records:
+            first, last = min(record[0] for record in records), max(record[0] for record in records)
+            self.progress.time_from = min(self.progress.time_from or first, first)
+            self.progress.time_to = max(self.progress.time_to or last, last)
+        self.progress.rows += len(rows)
+        self.progress.accepted += stored
+        self.progress.rejected += len(rows) - stored
+        self.report()
+
+    def validate(self, rows: list[Any]) -> list[ConditionRecord]:
+        records: dict[Any, ConditionRecord] = {}  # by time, keeps the last condition for duplicate times
+        for row in rows:
+            try:
+                station_condition = StationCondition.parse_obj(row)
+            except ValidationError:
+                continue
+            records[station_condition.time] = (
+                station_condition.time,
+                self.station_id,
+                station_condition.battery_percentage,
+                station_condition.temperature,
+                station_condition.humidity,
+                station_condition.pressure,
+            )
+
+        return list(records.values())
+
+    def report(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self._reported < self.report_interval:
+            return
+        self._reported = now
+        logger.info(
+            "Station %s: %d rows processed, %d stored, %d rejected, %.0f rows/s",
+            self.station_id,
+            self.progress.rows,
+            self.progress.accepted,
+            self.progress.rejected,
+            self.progress.rows_per_second,
+        )
+
+
+def load_checkpoint(path: str) -> BackfillProgress:
+    if not os.path.exists(path):
+        return BackfillProgress()
+    with open(path) as file:
+        checkpoint = json.load(file)
+    return BackfillProgress(rows=checkpoint["rows"])
+
+
+def save_checkpoint(path: str, progress: BackfillProgress) -> None:
+    """Replaces the checkpoint atomically so an interrupted write never corrupts it"""
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w") as file:
+        json.dump({"rows": progress.rows}, file)
+    os.replace(temporary_path, path)
+
+
+class CheckpointingImporter(BackfillImporter):
+    """Importer storing progress into checkpoint file after every stored chunk"""
+
+    def __init__(self, writer: ConditionWriter, station_id: int, checkpoint: str, **kwargs: Any):
+        super().__init__(writer, station_id, progress=load_checkpoint(checkpoint), **kwargs)
+        self.checkpoint = checkpoint
+
+    async def import_chunk(self, rows: list[Any]) -> None:
+        await super().import_chunk(rows)
+        save_checkpoint(self.checkpoint, self.progress)
+
+
+async def backfill(path: str, station_id: int, log_format: LogFormat, checkpoint: Optional[str], chunk_size: int):
+    db = create_database(get_config())
+    writer = ConditionWriter(db)
+    if checkpoint:
+        importer = CheckpointingImporter(writer, station_id, checkpoint, chunk_size=chunk_size)
+        if importer.progress.rows:
+            logger.info("Resuming import after %d rows", importer.progress.rows)
+    else:
+        importer = BackfillImporter(writer, station_id, chunk_size=chunk_size)
+
+    try:
+        with open(path, encoding="utf-8") as file:
+            progress = await importer.import_rows(iter_rows(file, RowParser(log_format)))
+        if progress.time_from:
+            await refresh_rollups(db, progress.time_from, progress.time_to)
+    finally:
+        await db.dispose()
+    importer.report(force=True)
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="Import station conditions log into database.")
+    arguments.add_argument("path", help="CSV (with header row) or NDJSON log file")
+    arguments.add_argument("--station-id", type=int, required=True)
+    arguments.add_argument("--format", type=LogFormat, choices=list(LogFormat), help="defaults to file extension")
+    arguments.add_argument("--checkpoint", help="progress file, import resumes from it when it exists")
+    arguments.add_argument("--chunk-size", type=int, default=5000)
+    args = arguments.parse_args()
+
+    log_format = args.format or (LogFormat.NDJSON if args.path.endswith((".ndjson", ".jsonl")) else LogFormat.CSV)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(backfill(args.path, args.station_id, log_format, args.checkpoint, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
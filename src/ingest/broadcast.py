@@ -0,0 +1,103 @@
+import asyncio
+import collections
+import time
+from typing import AsyncIterator, Optional, Sequence
+
+from src.ingest.writer import ConditionRecord
+
+# Publish time (perf_counter) and the record
+PublishedCondition = tuple[float, ConditionRecord]
+
+
+class Subscriber:
+    """Bounded queue of conditions published to a single subscription"""
+
+    def __init__(self, station_ids: Optional[frozenset[int]]):
+        self.station_ids = station_ids  # all stations when not set
+        self.pending: collections.deque[PublishedCondition] = collections.deque()
+        self.ready = asyncio.Event()
+        self.closed = False
+
+
+class ConditionBroadcaster:
+    """In-process fan-out of stored conditions to subscriptions
+
+    Publishing never waits for subscribers. When a slow subscriber's queue is full, a pending condition of the same
+    station is replaced by the new one (coalesced), otherwise the oldest pending condition is dropped.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: set[Subscriber] = set()
+
+        self.published = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def publish(self, records: Sequence[ConditionRecord]) -> None:
+        """`ConditionWriter` listener"""
+
+        published = time.perf_counter()
+        self.published += len(records)
+        for subscriber in self._subscribers:
+            for record in records:
+                if subscriber.station_ids is None or record[1] in subscriber.station_ids:
+                    self._push(subscriber, (published, record))
+
+    def _push(self, subscriber: Subscriber, condition: PublishedCondition) -> None:
+        pending = subscriber.pending
+        if len(pending) >= self.queue_size:
+            station_id = condition[1][1]
+            for index, (_, record) in enumerate(pending):
+                if record[1] == station_id:
+                    del pending[index]
+                    self.coalesced += 1
+                    break
+            else:
+                pending.popleft()
+                self.dropped += 1
+        pending.append(condition)
+        subscriber.ready.set()
+
+    async def subscribe(self, station_ids: Optional[frozenset[int]] = None) -> AsyncIterator[ConditionRecord]:
+        """Conditions stored from now on, ends when the broadcaster is closed"""
+
+        subscriber = Subscriber(station_ids)
+        self._subscribers.add(subscriber)
+        try:
+            while True:
+                while not subscriber.pending:
+                    if subscriber.closed:
+                        return
+                    subscriber.ready.clear()
+                    await subscriber.ready.wait()
+
+                published, record = subscriber.pending.popleft()
+                latency = time.perf_counter() - published
+                self.delivered += 1
+                self._latency_total += latency
+                self._latency_max = max(self._latency_max, latency)
+                yield record
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def close(self) -> None:
+        """Ends all subscriptions once their pending conditions are delivered"""
+
+        for subscriber in self._subscribers:
+            subscriber.closed = True
+            subscriber.ready.set()
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "fan_out_latency_avg_ms": self._latency_total / self.delivered * 1000 if self.delivered else 0.0,
+            "fan_out_latency_max_ms": self._latency_max * 1000,
+        }
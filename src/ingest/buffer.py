@@ -0,0 +1,152 @@
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from src import models
+from src.ingest.writer import ConditionRecord
+from src.ingest.writer import ConditionWriter
+from src.ingest.writer import condition_record
+
+logger = logging.getLogger(__name__)
+
+_STOP = None  # queue sentinel, see `IngestBuffer.stop`
+
+PendingCondition = tuple[ConditionRecord, Optional[asyncio.Future]]
+
+
+class IngestBufferFull(Exception):
+    """Buffer can't accept more conditions (full or shutting down)"""
+
+
+class IngestBuffer:
+    """Write-behind buffer coalescing single station conditions into bulk writes
+
+    A background task flushes pending conditions once `flush_size` of them are queued or `flush_interval` seconds
+    after the first one arrived. Callers can await the returned future to acknowledge only durably stored conditions.
+    """
+
+    def __init__(self, writer: ConditionWriter, max_size: int, flush_size: int, flush_interval: float):
+        self.writer = writer
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+
+        self.flushes = 0
+        self.flushed = 0
+        self.failed = 0
+        self.refused = 0
+
+        self._queue: asyncio.Queue[Optional[PendingCondition]] = asyncio.Queue(max_size)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops accepting conditions and flushes all pending ones"""
+
+        self._stopping = True
+        if self._task:
+            await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+
+    def submit(self, condition: models.StationCondition, wait: bool = False) -> Optional[asyncio.Future]:
+        """Queues condition for the next flush
+
+        Returns future resolved once the condition is stored when `wait` is set, raises `IngestBufferFull` when the
+        condition can't be queued.
+        """
+
+        if self._stopping:
+            self.refused += 1
+            raise IngestBufferFull()
+
+        flushed = asyncio.get_running_loop().create_future() if wait else None
+        try:
+            self._queue.put_nowait((condition_record(condition), flushed))
+        except asyncio.QueueFull:
+            self.refused += 1
+            raise IngestBufferFull()
+        return flushed
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopped = False
+        while not stopped:
+            pending = await self._queue.get()
+            if pending is _STOP:
+                break
+
+            batch = [pending]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.flush_size:
+                try:
+                    pending = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        pending = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+
+                if pending is _STOP:
+                    stopped = True
+                    break
+                batch.append(pending)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[PendingCondition]) -> None:
+        self.flushes += 1
+        try:
+            await self.writer.write([record for record, _ in batch])
+        except IntegrityError:
+            # Some condition conflicts with stored data - store the rest one by one
+            for pending in batch:
+                await self._flush_one(pending)
+            return
+        except Exception as error:
+            logger.exception("Flush of %d station conditions failed", len(batch))
+            for _, flushed in batch:
+                self._resolve(flushed, error)
+            self.failed += len(batch)
+            return
+
+        for _, flushed in batch:
+            self._resolve(flushed)
+        self.flushed += len(batch)
+
+    async def _flush_one(self, pending: PendingCondition) -> None:
+        record, flushed = pending
+        try:
+            await self.writer.write([record])
+        except Exception as error:
+            logger.warning("Station condition %s of station %s was not stored: %s", record[0], record[1], error)
+            self._resolve(flushed, error)
+            self.failed += 1
+        else:
+            self._resolve(flushed)
+            self.flushed += 1
+
+    @staticmethod
+    def _resolve(flushed: Optional[asyncio.Future], error: Optional[Exception] = None) -> None:
+        if flushed is None or flushed.done():
+            return  # caller doesn't wait or gave up waiting
+        if error:
+            flushed.set_exception(error)
+        else:
+            flushed.set_result(None)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pending": self._queue.qsize(),
+            "flushes": self.flushes,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "refused": self.refused,
+        }
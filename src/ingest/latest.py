@@ -0,0 +1,72 @@
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import and_, func, select
+
+from src import models
+from src.dependencies.database import Database
+from src.graphql_api.rollups import utc_naive
+from src.ingest.writer import CONDITION_COLUMNS
+from src.ingest.writer import ConditionRecord
+
+
+class LatestConditions:
+    """In-memory table of the most recent condition of each station
+
+    Seeded from database on startup and kept up to date as `ConditionWriter` listener, so current conditions are
+    served without querying the hypertable.
+    """
+
+    def __init__(self) -> None:
+        self._conditions: dict[int, ConditionRecord] = {}
+
+    def __len__(self) -> int:
+        return len(self._conditions)
+
+    def __contains__(self, station_id: int) -> bool:
+        return station_id in self._conditions
+
+    def get(self, station_id: int) -> Optional[ConditionRecord]:
+        return self._conditions.get(station_id)
+
+    def all(self, station_ids: Optional[Iterable[int]] = None) -> list[ConditionRecord]:
+        """Conditions ordered by station"""
+
+        if station_ids is None:
+            station_ids = self._conditions
+        return [self._conditions[station_id] for station_id in sorted(set(station_ids)) if station_id in self]
+
+    def update(self, records: Sequence[ConditionRecord]) -> None:
+        """Keeps records newer than the stored ones (imports and late conditions may be older)"""
+
+        for record in records:
+            time, station_id, *values = record
+            record = (utc_naive(time), station_id, *values)  # stored conditions are naive UTC
+            current = self._conditions.get(station_id)
+            if current is None or current[0] <= record[0]:
+                self._conditions[station_id] = record
+
+    def remove(self, station_id: int) -> None:
+        self._conditions.pop(station_id, None)
+
+    async def seed(self, db: Database) -> None:
+        """Loads the most recent condition of every station with a single query"""
+
+        condition = models.StationCondition
+        columns = [getattr(condition, name) for name in CONDITION_COLUMNS]
+        if db.engine.dialect.name == "postgresql":
+            query = (
+                select(*columns).distinct(condition.station_id).order_by(condition.station_id, condition.time.desc())
+            )
+        else:  # no DISTINCT ON
+            latest = (
+                select(condition.station_id, func.max(condition.time).label("time"))
+                .group_by(condition.station_id)
+                .subquery()
+            )
+            query = select(*columns).join(
+                latest, and_(condition.station_id == latest.c.station_id, condition.time == latest.c.time)
+            )
+
+        async with db.session() as session:
+            result = await session.execute(query)
+            self.update([tuple(row) for row in result])
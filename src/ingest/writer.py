@@ -0,0 +1,83 @@
+import datetime
+import logging
+from typing import Callable, Optional, Sequence
+
+import asyncpg
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import models
+from src.dependencies.database import Database
+
+logger = logging.getLogger(__name__)
+
+CONDITION_COLUMNS = ("time", "station_id", "battery_percentage", "temperature", "humidity", "pressure")
+
+# Values in `CONDITION_COLUMNS` order
+ConditionRecord = tuple[datetime.datetime, int, Optional[float], Optional[float], Optional[float], Optional[float]]
+
+
+def condition_record(condition: models.StationCondition) -> ConditionRecord:
+    return (
+        condition.time,
+        condition.station_id,
+        condition.battery_percentage,
+        condition.temperature,
+        condition.humidity,
+        condition.pressure,
+    )
+
+
+async def write_conditions(session: AsyncSession, records: Sequence[ConditionRecord]) -> None:
+    """Inserts records in one round trip - binary COPY on asyncpg, multi-row INSERT on other drivers
+
+    Raises `IntegrityError` when any record conflicts with stored data, nothing is written in that case.
+    """
+
+    connection = await session.connection()
+    if connection.dialect.driver != "asyncpg":
+        await session.execute(insert(models.StationCondition), [dict(zip(CONDITION_COLUMNS, r)) for r in records])
+        return
+
+    raw_connection = await connection.get_raw_connection()
+    asyncpg_connection: asyncpg.Connection = raw_connection.driver_connection
+    try:
+        # Savepoint when the session already started a transaction, own transaction otherwise
+        async with asyncpg_connection.transaction():
+            await asyncpg_connection.copy_records_to_table(
+                models.StationCondition.__tablename__, records=records, columns=CONDITION_COLUMNS
+            )
+    except asyncpg.IntegrityConstraintViolationError as error:
+        raise IntegrityError(f"COPY {models.StationCondition.__tablename__}", None, error) from error
+
+
+# Called with records after they are stored
+WriteListener = Callable[[Sequence[ConditionRecord]], None]
+
+
+class ConditionWriter:
+    """Bulk writer of station conditions shared by all ingest paths"""
+
+    def __init__(self, db: Database):
+        self.db = db
+        self._listeners: list[WriteListener] = []
+
+    def add_listener(self, listener: WriteListener) -> None:
+        self._listeners.append(listener)
+
+    async def write(self, records: Sequence[ConditionRecord]) -> None:
+        """Writes all records in a single transaction"""
+
+        if not records:
+            return
+
+        async with self.db.session() as session:
+            await write_conditions(session, records)
+
+        for listener in self._listeners:
+            try:
+                listener(records)
+            except Exception:
+                # Records are stored, listener failure must not fail the write
+                logger.exception("Condition write listener %r failed", listener)
@@ -1,11 +1,62 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
-from strawberry.fastapi import GraphQLRouter
+from fastapi.responses import ORJSONResponse
 
+from src.dependencies.cache import TTLCache
+from src.dependencies.config import get_config
 from src.dependencies.context import AppContext
+from src.dependencies.database import create_database
+from src.graphql_api.router import GraphQLRouter
 from src.graphql_api.schema import schema
+from src.graphql_api.spatial import StationIndex
+from src.ingest.broadcast import ConditionBroadcaster
+from src.ingest.buffer import IngestBuffer
+from src.ingest.latest import LatestConditions
+from src.ingest.writer import ConditionWriter
 from src.rest_api.routes import router
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Creates application scoped resources on startup and releases them on shutdown"""
+
+    config = get_config()
+    app.state.db = create_database(config)
+    app.state.api_key_cache = TTLCache(maxsize=config.API_KEY_CACHE_SIZE, ttl=config.API_KEY_CACHE_TTL)
+    app.state.condition_writer = ConditionWriter(app.state.db)
+
+    app.state.station_index = None
+    if config.STATION_INDEX_ENABLED:
+        app.state.station_index = StationIndex(cell_degrees=config.STATION_INDEX_CELL_DEGREES)
+        await app.state.station_index.seed(app.state.db)
+
+    app.state.latest_conditions = LatestConditions()
+    await app.state.latest_conditions.seed(app.state.db)
+    app.state.condition_writer.add_listener(app.state.latest_conditions.update)
+    app.state.condition_broadcaster = ConditionBroadcaster(queue_size=config.SUBSCRIPTION_QUEUE_SIZE)
+    app.state.condition_writer.add_listener(app.state.condition_broadcaster.publish)
+
+    app.state.ingest_buffer = None
+    if config.INGEST_BUFFER_ENABLED:
+        app.state.ingest_buffer = IngestBuffer(
+            app.state.condition_writer,
+            max_size=config.INGEST_BUFFER_MAX_SIZE,
+            flush_size=config.INGEST_FLUSH_SIZE,
+            flush_interval=config.INGEST_FLUSH_INTERVAL_MS / 1000,
+        )
+        app.state.ingest_buffer.start()
+
+    yield
+
+    if app.state.ingest_buffer:
+        await app.state.ingest_buffer.stop()
+    app.state.condition_broadcaster.close()
+    await app.state.db.dispose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 graphql_app = GraphQLRouter(schema, context_getter=AppContext)
 
@@ -1,5 +1,6 @@
 from sqlalchemy import ForeignKey
-from sqlalchemy import UniqueConstraint, Column, Integer, Float, TIMESTAMP, Text, Index, String
+from sqlalchemy import UniqueConstraint, Column, Integer, Float, TIMESTAMP, Text, Index, String, Boolean
+from sqlalchemy import false
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -40,6 +41,7 @@ class MonitorUser(Base):
     id = Column(Integer, primary_key=True)
     username = Column(String(80), unique=True, nullable=False)
     password = Column(String(128), nullable=False)
+    is_admin = Column(Boolean, nullable=False, default=False, server_default=false())
 
     weather_station = relationship("WeatherStation", back_populates="monitor_user_rel", cascade="all, delete")
 
@@ -0,0 +1,150 @@
+"""Streaming export of station conditions (CSV, NDJSON, Parquet)
+
+Conditions are read with a server-side cursor in chunks and each chunk is encoded and sent before the next one is
+fetched, so memory use doesn't depend on the export size. Parquet needs optional `pyarrow` (`parquet` extra),
+each chunk is written as a row group.
+"""
+
+import csv
+import datetime
+import enum
+import io
+import json
+from typing import AsyncIterator, Optional, Sequence
+
+from sqlalchemy import select
+
+from src import models
+from src.dependencies.database import Database
+from src.graphql_api.pagination import filter_conditions
+from src.ingest.writer import CONDITION_COLUMNS
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+
+    @property
+    def media_type(self) -> str:
+        return {
+            ExportFormat.CSV: "text/csv",
+            ExportFormat.NDJSON: "application/x-ndjson",
+            ExportFormat.PARQUET: "application/vnd.apache.parquet",
+        }[self]
+
+
+def parquet_available() -> bool:
+    return pyarrow is not None
+
+
+class CsvEncoder:
+    def header(self) -> bytes:
+        return self.encode([CONDITION_COLUMNS])
+
+    def encode(self, rows: Sequence[Sequence]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue().encode()
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class NdjsonEncoder:
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: Sequence[Sequence]) -> bytes:
+        lines = (json.dumps(dict(zip(CONDITION_COLUMNS, row)), default=datetime.datetime.isoformat) for row in rows)
+        return "".join(f"{line}\n" for line in lines).encode()
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class _ParquetSink(io.RawIOBase):
+    """Write-only file handing out written bytes, tracks position for Parquet metadata offsets"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetEncoder:
+    def __init__(self) -> None:
+        self.schema = pyarrow.schema(
+            [
+                ("time", pyarrow.timestamp("us")),
+                ("station_id", pyarrow.int32()),
+                ("battery_percentage", pyarrow.float64()),
+                ("temperature", pyarrow.float64()),
+                ("humidity", pyarrow.float64()),
+                ("pressure", pyarrow.float64()),
+            ]
+        )
+        self._sink = _ParquetSink()
+        self._writer = pyarrow.parquet.ParquetWriter(self._sink, self.schema)
+
+    def header(self) -> bytes:
+        return self._sink.take()
+
+    def encode(self, rows: Sequence[Sequence]) -> bytes:
+        columns = list(zip(*rows))
+        self._writer.write_table(pyarrow.Table.from_arrays(columns, schema=self.schema))
+        return self._sink.take()
+
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._sink.take()
+
+
+ENCODERS = {ExportFormat.CSV: CsvEncoder, ExportFormat.NDJSON: NdjsonEncoder, ExportFormat.PARQUET: ParquetEncoder}
+
+
+async def export_conditions(
+    db: Database,
+    export_format: ExportFormat,
+    station_ids: Optional[list[int]] = None,
+    time_from: Optional[datetime.datetime] = None,
+    time_to: Optional[datetime.datetime] = None,
+    chunk_size: int = 10000,
+) -> AsyncIterator[bytes]:
+    """Encoded conditions ordered by time and station"""
+
+    condition = models.StationCondition
+    query = select(*[getattr(condition, name) for name in CONDITION_COLUMNS]).order_by(
+        condition.time, condition.station_id
+    )
+    query = filter_conditions(query, station_ids, time_from, time_to)
+
+    encoder = ENCODERS[export_format]()
+    yield encoder.header()
+    async with db.session() as session:
+        result = await session.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions(chunk_size):
+            yield encoder.encode(rows)
+    yield encoder.footer()
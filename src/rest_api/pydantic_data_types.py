@@ -1,5 +1,5 @@
 import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -15,3 +15,20 @@ class StationCondition(BaseModel):
     temperature: Optional[float] = None
     humidity: Optional[float] = None
     pressure: Optional[float] = None
+
+
+class RejectedStationCondition(BaseModel):
+    index: int  # position in the request batch
+    reason: str
+
+
+class BatchInsertResult(BaseModel):
+    accepted: int
+    rejected: int
+    rejections: List[RejectedStationCondition] = []
+
+
+class ImportResult(BaseModel):
+    accepted: int
+    rejected: int
+    rows_per_second: float
@@ -1,14 +1,43 @@
-from typing import Optional
+import datetime
+from typing import Any, List, Optional
 
-from fastapi import Depends, HTTPException, APIRouter
+from fastapi import Body, Depends, HTTPException, APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from pydantic import ValidationError
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 
-from dependencies.database import get_database, Database
 from src import models
+from src.dependencies.auth import AuthStation
+from src.dependencies.auth import get_api_key_cache
 from src.dependencies.auth import get_auth_weather_station
+from src.dependencies.cache import TTLCache
+from src.dependencies.config import Config
+from src.dependencies.config import get_config
+from src.dependencies.database import get_database, Database
+from src.dependencies.ingest import get_condition_broadcaster
+from src.dependencies.ingest import get_condition_writer
+from src.dependencies.ingest import get_ingest_buffer
+from src.graphql_api.rollups import refresh_rollups
+from src.ingest.backfill import BackfillImporter
+from src.ingest.backfill import LogFormat
+from src.ingest.backfill import RowParser
+from src.ingest.backfill import aiter_lines
+from src.ingest.backfill import aiter_rows
+from src.ingest.broadcast import ConditionBroadcaster
+from src.ingest.buffer import IngestBuffer
+from src.ingest.buffer import IngestBufferFull
+from src.ingest.writer import ConditionRecord
+from src.ingest.writer import ConditionWriter
+from src.ingest.writer import condition_record
 from src.models import MonitorUser
-from src.models import WeatherStation
+from src.rest_api.export import ExportFormat
+from src.rest_api.export import export_conditions
+from src.rest_api.export import parquet_available
+from src.rest_api.pydantic_data_types import BatchInsertResult
+from src.rest_api.pydantic_data_types import ImportResult
+from src.rest_api.pydantic_data_types import RejectedStationCondition
 from src.rest_api.pydantic_data_types import UserInDB, StationCondition
 
 router = APIRouter()
@@ -36,19 +65,149 @@ async def login(
 @router.post(path="/conditions")
 async def insert_weather_conditions_data(
     station_condition: StationCondition,
-    db: Database = Depends(get_database),
-    auth_station: Optional[WeatherStation] = Depends(get_auth_weather_station),
+    config: Config = Depends(get_config),
+    writer: ConditionWriter = Depends(get_condition_writer),
+    ingest_buffer: Optional[IngestBuffer] = Depends(get_ingest_buffer),
+    auth_station: Optional[AuthStation] = Depends(get_auth_weather_station),
 ) -> None:
     if not auth_station:
         raise HTTPException(status_code=401, detail="Unauthorized access - request denied.")
 
-    async with db.session() as session:
-        new_condition = models.StationCondition(
-            time=station_condition.time,
-            station_id=auth_station.station_id,
-            battery_percentage=station_condition.battery_percentage,
-            temperature=station_condition.temperature,
-            humidity=station_condition.humidity,
-            pressure=station_condition.pressure,
+    new_condition = models.StationCondition(
+        time=station_condition.time,
+        station_id=auth_station.station_id,
+        battery_percentage=station_condition.battery_percentage,
+        temperature=station_condition.temperature,
+        humidity=station_condition.humidity,
+        pressure=station_condition.pressure,
+    )
+
+    if not ingest_buffer:
+        await writer.write([condition_record(new_condition)])
+        return
+
+    try:
+        flushed = ingest_buffer.submit(new_condition, wait=config.INGEST_ACK_AFTER_FLUSH)
+    except IngestBufferFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Ingest buffer full - retry later.",
+            headers={"Retry-After": str(config.INGEST_RETRY_AFTER)},
+        )
+
+    if flushed:
+        try:
+            await flushed
+        except IntegrityError:
+            raise HTTPException(status_code=409, detail="Condition conflicts with stored conditions.")
+
+
+@router.post(path="/conditions/batch")
+async def insert_weather_conditions_batch(
+    station_conditions: List[Any] = Body(...),
+    config: Config = Depends(get_config),
+    writer: ConditionWriter = Depends(get_condition_writer),
+    auth_station: Optional[AuthStation] = Depends(get_auth_weather_station),
+) -> BatchInsertResult:
+    """Store conditions buffered by a station in one round trip, invalid conditions are rejected individually"""
+
+    if not auth_station:
+        raise HTTPException(status_code=401, detail="Unauthorized access - request denied.")
+    if len(station_conditions) > config.INGEST_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413, detail=f"Batch too large - max {config.INGEST_BATCH_MAX_SIZE} conditions allowed."
+        )
+
+    records: list[ConditionRecord] = []
+    rejections: list[RejectedStationCondition] = []
+    batch_times = set()
+    for index, data in enumerate(station_conditions):
+        try:
+            station_condition = StationCondition.parse_obj(data)
+        except ValidationError as error:
+            rejections.append(RejectedStationCondition(index=index, reason=str(error)))
+            continue
+
+        if station_condition.time in batch_times:
+            rejections.append(RejectedStationCondition(index=index, reason="Duplicate time within batch."))
+            continue
+        batch_times.add(station_condition.time)
+
+        records.append(
+            (
+                station_condition.time,
+                auth_station.station_id,
+                station_condition.battery_percentage,
+                station_condition.temperature,
+                station_condition.humidity,
+                station_condition.pressure,
+            )
         )
-        session.add(new_condition)
\ No newline at end of file
+
+    try:
+        await writer.write(records)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Batch conflicts with stored conditions - nothing was stored.")
+
+    return BatchInsertResult(accepted=len(records), rejected=len(rejections), rejections=rejections)
+
+
+@router.post(path="/conditions/import")
+async def import_weather_conditions(
+    request: Request,
+    log_format: LogFormat = Query(default=LogFormat.CSV, alias="format"),
+    writer: ConditionWriter = Depends(get_condition_writer),
+    auth_station: Optional[AuthStation] = Depends(get_auth_weather_station),
+) -> ImportResult:
+    """Import station log (CSV with header row or NDJSON) streamed in request body, see `src.ingest.backfill`"""
+
+    if not auth_station:
+        raise HTTPException(status_code=401, detail="Unauthorized access - request denied.")
+
+    importer = BackfillImporter(writer, auth_station.station_id)
+    rows = aiter_rows(aiter_lines(request.stream()), RowParser(log_format))
+    progress = await importer.import_rows_stream(rows)
+    if progress.time_from:
+        await refresh_rollups(writer.db, progress.time_from, progress.time_to)
+
+    return ImportResult(
+        accepted=progress.accepted, rejected=progress.rejected, rows_per_second=progress.rows_per_second
+    )
+
+
+@router.get(path="/export")
+async def export(
+    station_ids: Optional[List[int]] = Query(default=None),
+    time_from: Optional[datetime.datetime] = None,
+    time_to: Optional[datetime.datetime] = None,
+    export_format: ExportFormat = Query(default=ExportFormat.CSV, alias="format"),
+    db: Database = Depends(get_database),
+    config: Config = Depends(get_config),
+) -> StreamingResponse:
+    """Stream conditions ordered by time, memory use doesn't depend on the number of exported conditions"""
+
+    if export_format == ExportFormat.PARQUET and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export is not available (pyarrow is not installed).")
+
+    chunks = export_conditions(db, export_format, station_ids, time_from, time_to, config.EXPORT_CHUNK_SIZE)
+    return StreamingResponse(
+        chunks,
+        media_type=export_format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="conditions.{export_format.value}"'},
+    )
+
+
+@router.get(path="/stats")
+async def stats(
+    db: Database = Depends(get_database),
+    api_key_cache: TTLCache = Depends(get_api_key_cache),
+    ingest_buffer: Optional[IngestBuffer] = Depends(get_ingest_buffer),
+    condition_broadcaster: ConditionBroadcaster = Depends(get_condition_broadcaster),
+) -> dict:
+    """Runtime statistics used for capacity planning"""
+    return {
+        "database_pool": db.pool_status(),
+        "api_key_cache": api_key_cache.stats(),
+        "ingest_buffer": ingest_buffer.stats() if ingest_buffer else None,
+        "subscriptions": condition_broadcaster.stats(),
+    }
@@ -0,0 +1,94 @@
+import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.dependencies.config import get_config
+from src.main import app
+from src.models import Base
+from src.models import MonitorUser
+from src.models import StationCondition
+from src.models import WeatherStation
+
+STATION_API_KEY = "station-api-key"
+
+
+class FakeWriter:
+    """`ConditionWriter` stand-in recording writes, records with `conflicting_times` fail as duplicates"""
+
+    def __init__(self, conflicting_times=()):
+        self.conflicting_times = set(conflicting_times)
+        self.writes = []
+
+    async def write(self, records):
+        if any(record[0] in self.conflicting_times for record in records):
+            raise IntegrityError("INSERT", None, Exception("duplicate key"))
+        self.writes.append(list(records))
+
+
+@pytest.fixture
+def database_url(tmp_path, monkeypatch):
+    """Empty SQLite database used instead of TimescaleDB"""
+
+    path = tmp_path / "weather_monitor.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    url = f"sqlite+aiosqlite:///{path}"
+    monkeypatch.setenv("DB_URL", url)
+    monkeypatch.setenv("INGEST_ACK_AFTER_FLUSH", "true")  # tests read stored conditions right after posting them
+    get_config.cache_clear()
+    yield url
+    get_config.cache_clear()
+
+
+@pytest.fixture
+def client(database_url):
+    """Test client with application lifespan (startup/shutdown) running against SQLite"""
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def store(database_url: str, *instances: Base) -> None:
+    """Stores model instances into test database"""
+
+    engine = create_engine(database_url.replace("+aiosqlite", ""))
+    with Session(engine) as session:
+        session.add_all(instances)
+        session.commit()
+    engine.dispose()
+
+
+@pytest.fixture
+def weather_station(database_url):
+    """Weather station (id 1, API key `STATION_API_KEY`) owned by user `user` (id 1)"""
+
+    store(
+        database_url,
+        MonitorUser(id=1, username="user", password="password"),
+        WeatherStation(station_id=1, longitude=14.42, latitude=50.08, api_key=STATION_API_KEY, user_id=1),
+    )
+    return 1
+
+
+def store_conditions(database_url):
+    """Second station (id 2) and three conditions of both stations, temperature is station_id * 10 + minute"""
+
+    store(database_url, WeatherStation(station_id=2, longitude=16.6, latitude=49.2, api_key="second", user_id=1))
+    for station_id in (1, 2):
+        store(
+            database_url,
+            *[
+                StationCondition(
+                    time=datetime.datetime(2022, 11, 27, 10, minute, station_id),
+                    station_id=station_id,
+                    temperature=station_id * 10 + minute,
+                )
+                for minute in range(3)
+            ],
+        )
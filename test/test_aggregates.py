@@ -0,0 +1,60 @@
+import datetime
+
+from src.models import StationCondition
+from test.conftest import store
+
+WEATHER_AGGREGATES = """
+    query WeatherAggregates($bucket: AggregateBucket!, $functions: [AggregateFunction!]) {
+        weatherAggregates(bucket: $bucket, stationIds: [1], functions: $functions) {
+            resourceId
+            bucket
+            temperature { min max avg count first last }
+        }
+    }
+"""
+
+
+def store_temperatures(database_url):
+    """Temperatures 0..5 every 20 minutes from 10:00, temperature at 10:40 is missing"""
+
+    start = datetime.datetime(2022, 11, 27, 10, 0)
+    store(
+        database_url,
+        *[
+            StationCondition(
+                time=start + datetime.timedelta(minutes=20 * index),
+                station_id=1,
+                temperature=None if index == 2 else float(index),
+            )
+            for index in range(6)
+        ],
+    )
+
+
+def test_conditions_are_aggregated_per_bucket(client, database_url, weather_station):
+    store_temperatures(database_url)
+
+    response = client.post("/graphql", json={"query": WEATHER_AGGREGATES, "variables": {"bucket": "HOUR"}})
+
+    aggregates = response.json()["data"]["weatherAggregates"]
+    assert [aggregate["bucket"] for aggregate in aggregates] == ["2022-11-27T10:00:00", "2022-11-27T11:00:00"]
+    assert aggregates[0]["temperature"] == {"min": 0, "max": 1, "avg": 0.5, "count": 2, "first": 0, "last": None}
+    assert aggregates[1]["temperature"] == {"min": 3, "max": 5, "avg": 4, "count": 3, "first": 3, "last": 5}
+
+
+def test_only_requested_functions_are_computed(client, database_url, weather_station):
+    store_temperatures(database_url)
+
+    variables = {"bucket": "DAY", "functions": ["MAX"]}
+    response = client.post("/graphql", json={"query": WEATHER_AGGREGATES, "variables": variables})
+
+    aggregates = response.json()["data"]["weatherAggregates"]
+    assert len(aggregates) == 1
+    assert aggregates[0]["temperature"] == {
+        "min": None,
+        "max": 5,
+        "avg": None,
+        "count": None,
+        "first": None,
+        "last": None,
+    }
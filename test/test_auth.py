@@ -0,0 +1,47 @@
+from test.conftest import STATION_API_KEY
+
+UPDATE_API_KEY = """
+    mutation UpdateApiKey($apiKey: String!) {
+        updateWeatherStation(weatherStationUpdate: {stationId: 1, apiKey: $apiKey}) {
+            resourceUpdated
+        }
+    }
+"""
+
+
+def test_station_api_key_is_looked_up_once(client, weather_station):
+    headers = {"Authorization": f"Bearer {STATION_API_KEY}"}
+    for second in range(3):
+        response = client.post("/conditions", json={"time": f"2022-11-27T10:00:0{second}"}, headers=headers)
+        assert response.status_code == 200
+
+    assert client.get("/stats").json()["api_key_cache"]["hits"] == 2
+
+
+def test_unknown_api_key_is_cached(client, weather_station):
+    for _ in range(2):
+        response = client.post(
+            "/conditions", json={"time": "2022-11-27T10:00:00"}, headers={"Authorization": "Bearer bad"}
+        )
+        assert response.status_code == 401
+
+    stats = client.get("/stats").json()["api_key_cache"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_changed_api_key_is_invalidated(client, weather_station):
+    old_headers = {"Authorization": f"Bearer {STATION_API_KEY}"}
+    new_headers = {"Authorization": "Bearer new-api-key"}
+    assert client.post("/conditions", json={"time": "2022-11-27T10:00:00"}, headers=old_headers).status_code == 200
+    assert client.post("/conditions", json={"time": "2022-11-27T10:00:01"}, headers=new_headers).status_code == 401
+
+    response = client.post(
+        "/graphql",
+        json={"query": UPDATE_API_KEY, "variables": {"apiKey": "new-api-key"}},
+        headers={"Authorize": "Bearer user"},
+    )
+    assert response.json()["data"]["updateWeatherStation"]["resourceUpdated"] is True
+
+    assert client.post("/conditions", json={"time": "2022-11-27T10:00:02"}, headers=old_headers).status_code == 401
+    assert client.post("/conditions", json={"time": "2022-11-27T10:00:03"}, headers=new_headers).status_code == 200
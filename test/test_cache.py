@@ -0,0 +1,43 @@
+from src.dependencies.cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=10, ttl=5, timer=timer)
+    cache.set("key", "value")
+
+    timer.now = 4.9
+    assert cache.get("key") == "value"
+    timer.now = 5.0
+    assert cache.get("key") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_cached_none_is_distinguishable_from_missing_key():
+    missing = object()
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("unknown", None)
+
+    assert cache.get("unknown", missing) is None
+    assert cache.get("other", missing) is missing
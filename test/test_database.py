@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.dependencies.database import Database
+
+
+@pytest.mark.asyncio
+async def test_pool_status_counts_checkouts(database_url):
+    db = Database(database_url, poolclass=AsyncAdaptedQueuePool, pool_size=2, max_overflow=0)
+
+    async with db.session() as session:
+        await session.execute(text("SELECT 1"))
+        assert db.pool_status()["checked_out"] == 1
+
+    status = db.pool_status()
+    assert status["size"] == 2
+    assert status["checked_out"] == 0
+    assert status["checked_in"] == 1
+    assert status["checkouts"] == 1
+    await db.dispose()
+
+
+def test_stats_endpoint_reuses_application_pool(client):
+    assert client.get("/stats").status_code == 200
+    db = client.app.state.db
+
+    client.get("/stats")
+    assert client.app.state.db is db
+    assert client.get("/stats").json()["database_pool"]["checkout_timeouts"] == 0
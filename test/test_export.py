@@ -0,0 +1,54 @@
+import io
+import json
+
+import pytest
+
+from src.dependencies.config import Config
+from src.dependencies.config import get_config
+from test.conftest import store_conditions
+
+
+@pytest.fixture
+def chunks_of_two(client):
+    client.app.dependency_overrides[get_config] = lambda: Config(EXPORT_CHUNK_SIZE=2)
+    yield
+    client.app.dependency_overrides.clear()
+
+
+def test_export_csv(client, database_url, weather_station):
+    store_conditions(database_url)
+
+    response = client.get("/export", params={"station_ids": [2], "time_from": "2022-11-27T10:01:00"})
+
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines() == [
+        "time,station_id,battery_percentage,temperature,humidity,pressure",
+        "2022-11-27 10:01:02,2,,21.0,,",
+        "2022-11-27 10:02:02,2,,22.0,,",
+    ]
+
+
+def test_export_ndjson_in_chunks(client, database_url, weather_station, chunks_of_two):
+    store_conditions(database_url)
+
+    response = client.get("/export", params={"format": "ndjson"})
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(row["time"], row["station_id"]) for row in rows[:3]] == [
+        ("2022-11-27T10:00:01", 1),
+        ("2022-11-27T10:00:02", 2),
+        ("2022-11-27T10:01:01", 1),
+    ]
+    assert len(rows) == 6
+
+
+def test_export_parquet_row_groups(client, database_url, weather_station, chunks_of_two):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    store_conditions(database_url)
+
+    response = client.get("/export", params={"format": "parquet", "station_ids": [1, 2]})
+
+    assert parquet.ParquetFile(io.BytesIO(response.content)).num_row_groups == 3
+    table = parquet.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 6
+    assert table.column("temperature").to_pylist() == [10.0, 20.0, 11.0, 21.0, 12.0, 22.0]
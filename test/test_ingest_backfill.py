@@ -0,0 +1,57 @@
+import pytest
+
+from src.ingest.backfill import CheckpointingImporter
+from src.ingest.backfill import LogFormat
+from src.ingest.backfill import RowParser
+from src.ingest.backfill import iter_rows
+from test.conftest import FakeWriter
+from test.conftest import STATION_API_KEY
+
+CSV_LOG = """time,temperature,humidity
+2022-11-27T10:00:00,1.5,80
+2022-11-27T10:00:01,,81
+2022-11-27T10:00:02,invalid,82
+
+2022-11-27T10:00:03,2.5,83
+"""
+
+
+def test_csv_rows_are_decoded_with_header():
+    rows = list(iter_rows(CSV_LOG.splitlines(), RowParser(LogFormat.CSV)))
+
+    assert len(rows) == 4
+    assert rows[1] == {"time": "2022-11-27T10:00:01", "temperature": None, "humidity": "81"}
+
+
+def test_undecodable_ndjson_line_is_kept_for_validation():
+    lines = ['{"time": "2022-11-27T10:00:00"}', "{broken"]
+
+    assert list(iter_rows(lines, RowParser(LogFormat.NDJSON))) == [{"time": "2022-11-27T10:00:00"}, "{broken"]
+
+
+@pytest.mark.asyncio
+async def test_import_resumes_from_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / "import.checkpoint")
+    writer = FakeWriter()
+
+    importer = CheckpointingImporter(writer, station_id=1, checkpoint=checkpoint, chunk_size=2)
+    rows = iter_rows(CSV_LOG.splitlines(), RowParser(LogFormat.CSV))
+    await importer.import_chunk([next(rows), next(rows)])  # import interrupted after first chunk
+
+    resumed = CheckpointingImporter(writer, station_id=1, checkpoint=checkpoint, chunk_size=2)
+    progress = await resumed.import_rows(iter_rows(CSV_LOG.splitlines(), RowParser(LogFormat.CSV)))
+
+    stored_times = [record[0].second for write in writer.writes for record in write]
+    assert stored_times == [0, 1, 3]
+    assert (progress.rows, progress.accepted, progress.rejected) == (4, 1, 1)
+
+
+def test_streamed_log_is_imported(client, weather_station):
+    response = client.post(
+        "/conditions/import?format=csv",
+        content=CSV_LOG.encode(),
+        headers={"Authorization": f"Bearer {STATION_API_KEY}"},
+    )
+
+    assert response.status_code == 200
+    assert (response.json()["accepted"], response.json()["rejected"]) == (3, 1)
@@ -0,0 +1,47 @@
+from src.dependencies.config import Config
+from src.dependencies.config import get_config
+from test.conftest import STATION_API_KEY
+
+HEADERS = {"Authorization": f"Bearer {STATION_API_KEY}"}
+WEATHER_DATA = "query { weatherData { time resourceId temperature } }"
+
+
+def test_batch_stores_valid_conditions_and_rejects_invalid(client, weather_station):
+    batch = [
+        {"time": "2022-11-27T10:00:00", "temperature": 1.5},
+        {"time": "not a time"},
+        {"time": "2022-11-27T10:00:01", "temperature": 2.5},
+        {"time": "2022-11-27T10:00:01", "temperature": 3.5},
+        "not an object",
+    ]
+
+    response = client.post("/conditions/batch", json=batch, headers=HEADERS)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["accepted"], result["rejected"]) == (2, 3)
+    assert [rejection["index"] for rejection in result["rejections"]] == [1, 3, 4]
+
+    stored = client.post("/graphql", json={"query": WEATHER_DATA}).json()["data"]["weatherData"]
+    assert [(condition["resourceId"], condition["temperature"]) for condition in stored] == [(1, 1.5), (1, 2.5)]
+
+
+def test_batch_size_is_capped(client, weather_station):
+    client.app.dependency_overrides[get_config] = lambda: Config(INGEST_BATCH_MAX_SIZE=2)
+    batch = [{"time": f"2022-11-27T10:{minute:02}:00"} for minute in range(3)]
+
+    try:
+        assert client.post("/conditions/batch", json=batch, headers=HEADERS).status_code == 413
+    finally:
+        client.app.dependency_overrides.clear()
+
+
+def test_batch_conflicting_with_stored_conditions_is_refused(client, weather_station):
+    client.post("/conditions", json={"time": "2022-11-27T10:00:00"}, headers=HEADERS)
+
+    batch = [{"time": "2022-11-27T10:00:00"}, {"time": "2022-11-27T10:00:01"}]
+    assert client.post("/conditions/batch", json=batch, headers=HEADERS).status_code == 409
+
+
+def test_batch_requires_station_api_key(client, weather_station):
+    assert client.post("/conditions/batch", json=[], headers={"Authorization": "Bearer bad"}).status_code == 401
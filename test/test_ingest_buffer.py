@@ -0,0 +1,79 @@
+import asyncio
+import datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from src import models
+from src.ingest.buffer import IngestBuffer
+from src.ingest.buffer import IngestBufferFull
+from test.conftest import FakeWriter
+
+
+def condition(second: int) -> models.StationCondition:
+    return models.StationCondition(time=datetime.datetime(2022, 11, 27, 10, 0, second), station_id=1)
+
+
+@pytest.mark.asyncio
+async def test_conditions_are_flushed_in_bulk_when_flush_size_is_reached():
+    writer = FakeWriter()
+    buffer = IngestBuffer(writer, max_size=100, flush_size=3, flush_interval=60)
+    buffer.start()
+
+    flushed = [buffer.submit(condition(second), wait=True) for second in range(6)]
+    await asyncio.wait_for(asyncio.gather(*flushed), timeout=1)
+
+    assert [len(write) for write in writer.writes] == [3, 3]
+    await buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_pending_conditions_are_flushed_after_interval():
+    writer = FakeWriter()
+    buffer = IngestBuffer(writer, max_size=100, flush_size=100, flush_interval=0.01)
+    buffer.start()
+
+    await asyncio.wait_for(buffer.submit(condition(0), wait=True), timeout=1)
+
+    assert len(writer.writes) == 1
+    await buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_refuses_conditions():
+    buffer = IngestBuffer(FakeWriter(), max_size=1, flush_size=10, flush_interval=60)
+    buffer.submit(condition(0))
+
+    with pytest.raises(IngestBufferFull):
+        buffer.submit(condition(1))
+    assert buffer.stats()["refused"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_conditions():
+    writer = FakeWriter()
+    buffer = IngestBuffer(writer, max_size=100, flush_size=100, flush_interval=60)
+    buffer.start()
+    for second in range(5):
+        buffer.submit(condition(second))
+
+    await buffer.stop()
+
+    assert sum(len(write) for write in writer.writes) == 5
+    with pytest.raises(IngestBufferFull):
+        buffer.submit(condition(6))
+
+
+@pytest.mark.asyncio
+async def test_conflicting_condition_does_not_prevent_storing_others():
+    writer = FakeWriter(conflicting_times={condition(1).time})
+    buffer = IngestBuffer(writer, max_size=100, flush_size=3, flush_interval=60)
+    buffer.start()
+
+    flushed = [buffer.submit(condition(second), wait=True) for second in range(3)]
+    results = await asyncio.wait_for(asyncio.gather(*flushed, return_exceptions=True), timeout=1)
+
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], IntegrityError)
+    assert buffer.stats()["flushed"] == 2
+    await buffer.stop()
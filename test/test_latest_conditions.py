@@ -0,0 +1,47 @@
+import datetime
+
+from fastapi.testclient import TestClient
+
+from src.ingest.latest import LatestConditions
+from src.main import app
+from test.conftest import STATION_API_KEY
+from test.conftest import store_conditions
+
+CURRENT_CONDITIONS = """
+    query {
+        currentConditions { resourceId time temperature }
+        weatherStations { resourceId latestCondition { temperature } }
+    }
+"""
+
+
+def test_latest_conditions_are_seeded_on_startup(database_url, weather_station):
+    store_conditions(database_url)
+
+    with TestClient(app) as client:
+        data = client.post("/graphql", json={"query": CURRENT_CONDITIONS}).json()["data"]
+
+    assert data["currentConditions"] == [
+        {"resourceId": 1, "time": "2022-11-27T10:02:01", "temperature": 12.0},
+        {"resourceId": 2, "time": "2022-11-27T10:02:02", "temperature": 22.0},
+    ]
+    assert [station["latestCondition"]["temperature"] for station in data["weatherStations"]] == [12.0, 22.0]
+
+
+def test_latest_condition_is_updated_on_insert(client, weather_station):
+    headers = {"Authorization": f"Bearer {STATION_API_KEY}"}
+    client.post("/conditions", json={"time": "2022-11-27T10:05:00", "temperature": 5}, headers=headers)
+    client.post("/conditions", json={"time": "2022-11-27T10:01:00", "temperature": 1}, headers=headers)  # late
+
+    data = client.post("/graphql", json={"query": CURRENT_CONDITIONS}).json()["data"]
+    assert data["currentConditions"] == [{"resourceId": 1, "time": "2022-11-27T10:05:00", "temperature": 5.0}]
+
+
+def test_latest_conditions_are_naive_utc():
+    latest = LatestConditions()
+    utc_plus_one = datetime.timezone(datetime.timedelta(hours=1))
+    latest.update([(datetime.datetime(2022, 11, 27, 11, 0, tzinfo=utc_plus_one), 1, None, 1.0, None, None)])
+    latest.update([(datetime.datetime(2022, 11, 27, 10, 30), 1, None, 2.0, None, None)])
+
+    assert latest.get(1)[0] == datetime.datetime(2022, 11, 27, 10, 30)
+    assert latest.all([1, 2]) == [latest.get(1)]
@@ -0,0 +1,75 @@
+from src.dependencies.config import Config
+from src.dependencies.config import get_config
+from test.conftest import store_conditions
+
+WEATHER_DATA_PAGE = """
+    query WeatherDataPage($first: Int, $after: String, $last: Int, $before: String, $stationIds: [Int!]) {
+        weatherDataConnection(first: $first, after: $after, last: $last, before: $before, stationIds: $stationIds) {
+            edges { node { resourceId temperature } }
+            pageInfo { hasNextPage hasPreviousPage startCursor endCursor }
+        }
+    }
+"""
+
+STATION_CONDITIONS_PAGE = """
+    query StationConditionsPage {
+        weatherStations {
+            weatherStationConditionsConnection(first: 2) {
+                edges { node { temperature } }
+                pageInfo { hasNextPage }
+            }
+        }
+    }
+"""
+
+
+def fetch_page(client, **variables) -> dict:
+    response = client.post("/graphql", json={"query": WEATHER_DATA_PAGE, "variables": variables})
+    return response.json()["data"]["weatherDataConnection"]
+
+
+def temperatures(page: dict) -> list:
+    return [edge["node"]["temperature"] for edge in page["edges"]]
+
+
+def test_pages_follow_each_other(client, database_url, weather_station):
+    store_conditions(database_url)
+
+    first_page = fetch_page(client, first=4)
+    second_page = fetch_page(client, first=4, after=first_page["pageInfo"]["endCursor"])
+
+    assert temperatures(first_page) == [10, 20, 11, 21]
+    assert first_page["pageInfo"]["hasNextPage"] is True
+    assert temperatures(second_page) == [12, 22]
+    assert second_page["pageInfo"]["hasNextPage"] is False
+
+
+def test_backward_pages(client, database_url, weather_station):
+    store_conditions(database_url)
+
+    last_page = fetch_page(client, last=4, stationIds=[2])
+    previous_page = fetch_page(client, last=4, stationIds=[2], before=last_page["pageInfo"]["startCursor"])
+
+    assert temperatures(last_page) == [20, 21, 22]
+    assert last_page["pageInfo"]["hasPreviousPage"] is False
+    assert temperatures(previous_page) == []
+
+
+def test_page_size_is_capped(client, weather_station):
+    client.app.dependency_overrides[get_config] = lambda: Config(GRAPHQL_MAX_PAGE_SIZE=5)
+    try:
+        response = client.post("/graphql", json={"query": WEATHER_DATA_PAGE, "variables": {"first": 6}})
+    finally:
+        client.app.dependency_overrides.clear()
+
+    assert response.json()["errors"][0]["message"] == "Page size must be between 1 and 5."
+
+
+def test_station_conditions_page(client, database_url, weather_station):
+    store_conditions(database_url)
+
+    response = client.post("/graphql", json={"query": STATION_CONDITIONS_PAGE})
+
+    pages = [station["weatherStationConditionsConnection"] for station in response.json()["data"]["weatherStations"]]
+    assert [temperatures(page) for page in pages] == [[10, 11], [20, 21]]
+    assert all(page["pageInfo"]["hasNextPage"] for page in pages)
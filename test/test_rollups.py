@@ -0,0 +1,42 @@
+import datetime
+
+from sqlalchemy.dialects import postgresql
+
+from src.graphql_api.aggregates import AggregateBucket
+from src.graphql_api.aggregates import AggregateFunction
+from src.graphql_api.rollups import ROLLUPS
+from src.graphql_api.rollups import pick_rollup
+from src.graphql_api.rollups import rollup_aggregates_query
+
+DAILY, HOURLY = ROLLUPS
+
+
+def test_rollup_alignment():
+    time = datetime.datetime(2022, 11, 27, 10, 30)
+    assert HOURLY.floor(time) == datetime.datetime(2022, 11, 27, 10)
+    assert HOURLY.ceil(time) == datetime.datetime(2022, 11, 27, 11)
+    assert DAILY.ceil(datetime.datetime(2022, 11, 27)) == datetime.datetime(2022, 11, 27)
+
+
+def test_pick_rollup():
+    views = frozenset({"weather_hourly", "weather_daily"})
+    assert pick_rollup(AggregateBucket.MINUTE, views) is None
+    assert pick_rollup(AggregateBucket.HOUR, views) == HOURLY
+    assert pick_rollup(AggregateBucket.WEEK, views) == DAILY
+    assert pick_rollup(AggregateBucket.WEEK, frozenset({"weather_hourly"})) == HOURLY
+    assert pick_rollup(AggregateBucket.DAY, frozenset()) is None
+
+
+def test_rollup_query_merges_partials():
+    query = rollup_aggregates_query(
+        HOURLY,
+        AggregateBucket.DAY,
+        list(AggregateFunction),
+        station_ids=[1],
+        time_from=datetime.datetime(2022, 11, 27, 10, 30),
+        time_to=datetime.datetime(2022, 11, 28, 10, 30),
+    )
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert "FROM weather_hourly" in sql
+    assert "UNION ALL" in sql
+    assert "sum(anon_1.temperature_sum) / nullif(sum(anon_1.temperature_count)" in sql
@@ -0,0 +1,46 @@
+from src.dependencies.config import Config
+from src.dependencies.config import get_config
+from test.conftest import store_conditions
+
+WEATHER_SERIES = """
+    query WeatherSeries($stationIds: [Int!]) {
+        weatherSeries(stationIds: $stationIds, timeFilter: {timeFrom: "2022-11-27T10:01:00"}) {
+            resourceId
+            time
+            temperature
+            humidity
+        }
+    }
+"""
+
+
+def test_conditions_as_columns(client, database_url, weather_station):
+    store_conditions(database_url)
+
+    response = client.post("/graphql", json={"query": WEATHER_SERIES})
+
+    assert response.json()["data"]["weatherSeries"] == [
+        {
+            "resourceId": 1,
+            "time": ["2022-11-27T10:01:01", "2022-11-27T10:02:01"],
+            "temperature": [11.0, 12.0],
+            "humidity": [None, None],
+        },
+        {
+            "resourceId": 2,
+            "time": ["2022-11-27T10:01:02", "2022-11-27T10:02:02"],
+            "temperature": [21.0, 22.0],
+            "humidity": [None, None],
+        },
+    ]
+
+
+def test_series_size_is_capped(client, database_url, weather_station):
+    store_conditions(database_url)
+    client.app.dependency_overrides[get_config] = lambda: Config(GRAPHQL_MAX_SERIES_POINTS=3)
+    try:
+        response = client.post("/graphql", json={"query": WEATHER_SERIES})
+    finally:
+        client.app.dependency_overrides.clear()
+
+    assert response.json()["errors"][0]["message"].startswith("More than 3 conditions")
@@ -0,0 +1,42 @@
+from sqlalchemy import event
+
+from test.conftest import store_conditions
+
+STATION_CONDITIONS = """
+    query StationConditions($last: Int) {
+        weatherStations {
+            resourceId
+            weatherStationConditions(last: $last) {
+                time
+                temperature
+            }
+        }
+    }
+"""
+
+
+def count_statements(client) -> list:
+    statements = []
+    event.listen(client.app.state.db.engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(1))
+    return statements
+
+
+def test_conditions_of_all_stations_are_loaded_with_single_query(client, database_url, weather_station):
+    store_conditions(database_url)
+    statements = count_statements(client)
+
+    response = client.post("/graphql", json={"query": STATION_CONDITIONS})
+
+    stations = response.json()["data"]["weatherStations"]
+    assert [len(station["weatherStationConditions"]) for station in stations] == [3, 3]
+    assert len(statements) == 2  # stations + conditions of all stations
+
+
+def test_last_conditions_of_each_station(client, database_url, weather_station):
+    store_conditions(database_url)
+
+    response = client.post("/graphql", json={"query": STATION_CONDITIONS, "variables": {"last": 2}})
+
+    stations = response.json()["data"]["weatherStations"]
+    temperatures = [[condition["temperature"] for condition in s["weatherStationConditions"]] for s in stations]
+    assert temperatures == [[11, 12], [21, 22]]
@@ -0,0 +1,20 @@
+from src.models import MonitorUser
+from test.conftest import store
+
+HYPERTABLE_STORAGE = """
+    mutation {
+        hypertableStorage { totalBytes compressionRatio chunks { chunkName compressed } }
+    }
+"""
+
+
+def test_storage_requires_admin(client, weather_station):
+    response = client.post("/graphql", json={"query": HYPERTABLE_STORAGE}, headers={"Authorize": "Bearer user"})
+    assert response.json()["errors"][0]["message"] == "User is not an administrator"
+
+
+def test_storage_requires_timescaledb(client, database_url):
+    store(database_url, MonitorUser(id=2, username="admin", password="password", is_admin=True))
+
+    response = client.post("/graphql", json={"query": HYPERTABLE_STORAGE}, headers={"Authorize": "Bearer admin"})
+    assert response.json()["errors"][0]["message"] == "Storage statistics require TimescaleDB."
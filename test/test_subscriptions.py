@@ -0,0 +1,64 @@
+import asyncio
+import datetime
+import time
+
+from src.ingest.broadcast import ConditionBroadcaster
+from test.conftest import STATION_API_KEY
+
+STATION_CONDITIONS = """
+    subscription {
+        stationConditions(boundingBox: {minLong: 14, minLat: 50, maxLong: 15, maxLat: 51}) { resourceId temperature }
+    }
+"""
+
+
+def record(station_id, minute, temperature=None):
+    return datetime.datetime(2022, 11, 27, 10, minute), station_id, None, temperature, None, None
+
+
+def wait_for_subscribers(client, count):
+    for _ in range(100):
+        if client.get("/stats").json()["subscriptions"]["subscribers"] == count:
+            return
+        time.sleep(0.01)
+    raise AssertionError("subscription not started")
+
+
+def test_stored_conditions_are_streamed(client, weather_station):
+    with client.websocket_connect("/graphql", subprotocols=["graphql-transport-ws"]) as websocket:
+        websocket.send_json({"type": "connection_init"})
+        assert websocket.receive_json()["type"] == "connection_ack"
+        websocket.send_json({"id": "1", "type": "subscribe", "payload": {"query": STATION_CONDITIONS}})
+        wait_for_subscribers(client, 1)
+
+        headers = {"Authorization": f"Bearer {STATION_API_KEY}"}
+        client.post("/conditions", json={"time": "2022-11-27T10:00:00", "temperature": 5}, headers=headers)
+
+        message = websocket.receive_json()
+        assert message["type"] == "next"
+        assert message["payload"]["data"]["stationConditions"] == {"resourceId": 1, "temperature": 5.0}
+        websocket.send_json({"id": "1", "type": "complete"})
+
+    stats = client.get("/stats").json()["subscriptions"]
+    assert stats["delivered"] == 1
+
+
+def test_slow_subscriber_conditions_are_coalesced_and_dropped():
+    async def run():
+        broadcaster = ConditionBroadcaster(queue_size=2)
+        subscription = broadcaster.subscribe(frozenset({1, 2, 3}))
+        first = asyncio.ensure_future(subscription.__anext__())
+        await asyncio.sleep(0)  # subscribed, waiting for conditions
+
+        broadcaster.publish([record(1, 0, 0.0)])
+        assert (await first)[3] == 0.0
+
+        # Queue of 2: condition 1.0 is replaced by newer condition of the same station, 21.0 is dropped as the oldest
+        broadcaster.publish([record(1, 1, 1.0), record(2, 1, 21.0), record(1, 2, 2.0), record(3, 2, 32.0)])
+        broadcaster.publish([record(4, 3, 43.0)])  # not subscribed
+        broadcaster.close()
+        return [condition[3] async for condition in subscription], broadcaster.stats()
+
+    temperatures, stats = asyncio.run(run())
+    assert temperatures == [2.0, 32.0]
+    assert (stats["coalesced"], stats["dropped"], stats["subscribers"]) == (1, 1, 0)